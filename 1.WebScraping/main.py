@@ -1,20 +1,39 @@
 import os
 import re
+import json
+import glob
+import codecs
 import time
+import base64
+import hashlib
 import logging
 import zipfile
+import zlib
 import sys
+import queue
+import argparse
+import threading
 from abc import ABC, abstractmethod
-from urllib.parse import urljoin
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from collections import deque
+from urllib.parse import unquote, urldefrag, urljoin, urlparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+try:
+    from lxml import etree
+except ImportError:  # lxml é opcional; sem ele usamos o tokenizador da biblioteca padrão
+    etree = None
 
 class Logger:
     """Classe responsável pelo gerenciamento de logs da aplicação."""
@@ -74,20 +93,172 @@ class WebScraper(ABC):
         pass
 
 
+class AnchorParser(ABC):
+    """Backend de parsing que extrai apenas as âncoras (href, texto) de um HTML."""
+    
+    name = ""
+    
+    @abstractmethod
+    def parse(self, chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Processa o HTML de forma incremental.
+        
+        Args:
+            chunks: Pedaços do HTML, na ordem em que chegam da rede
+            
+        Returns:
+            Um iterador de tuplas (href, texto) para cada âncora com href
+        """
+        pass
+
+
+class LxmlAnchorParser(AnchorParser):
+    """Backend baseado no parser HTML em C do lxml, emitindo só os eventos de <a>."""
+    
+    name = "lxml"
+    
+    def parse(self, chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        parser = etree.HTMLPullParser(events=('end',), tag='a')
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from self._drain(parser)
+        parser.close()
+        yield from self._drain(parser)
+    
+    @staticmethod
+    def _drain(parser: "etree.HTMLPullParser") -> Iterator[Tuple[str, str]]:
+        for _, element in parser.read_events():
+            href = element.get('href')
+            if href is not None:
+                yield href, ''.join(element.itertext()).strip()
+            # Libera o conteúdo já processado para manter a memória baixa
+            element.clear(keep_tail=True)
+
+
+class _AnchorTokenizer(HTMLParser):
+    """Tokenizador que acumula texto apenas enquanto está dentro de um <a>."""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors: List[Tuple[str, str]] = []
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+    
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._text = []
+    
+    def handle_data(self, data: str) -> None:
+        if self._href is not None:
+            self._text.append(data)
+    
+    def handle_endtag(self, tag: str) -> None:
+        if tag == 'a' and self._href is not None:
+            self.anchors.append((self._href, ''.join(self._text).strip()))
+            self._href = None
+
+
+class StreamingAnchorParser(AnchorParser):
+    """Backend sem dependências externas, baseado no html.parser da biblioteca padrão."""
+    
+    name = "html.parser (streaming)"
+    
+    def parse(self, chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        tokenizer = _AnchorTokenizer()
+        for chunk in chunks:
+            tokenizer.feed(chunk)
+            yield from tokenizer.anchors
+            tokenizer.anchors.clear()
+        tokenizer.close()
+        yield from tokenizer.anchors
+
+
+def default_anchor_parser() -> AnchorParser:
+    """Escolhe o backend de parsing mais rápido disponível no ambiente."""
+    if etree is not None:
+        return LxmlAnchorParser()
+    return StreamingAnchorParser()
+
+
 class StaticWebScraper(WebScraper):
-    """Implementação de web scraper para páginas estáticas usando requests e BeautifulSoup."""
+    """Implementação de web scraper para páginas estáticas usando requests e um parser de âncoras."""
+    
+    # Padrões pré-compilados aplicados sobre texto e href já em minúsculas
+    ANEXO_I_TEXT = re.compile(r'anexo i')
+    ANEXO_II_TEXT = re.compile(r'anexo ii')
+    ANEXO_I_HREF = re.compile(r'anexo_?i')
+    ANEXO_II_HREF = re.compile(r'anexo_?ii')
+    ANEXO_I_NAME = re.compile(r'i\.|_i_')
+    ANEXO_II_NAME = re.compile(r'ii\.|_ii_')
+    
+    def __init__(self, logger: Logger, parser: Optional[AnchorParser] = None):
+        """
+        Inicializa o scraper estático.
+        
+        Args:
+            logger: Logger da aplicação
+            parser: Backend de parsing (o mais rápido disponível é escolhido se omitido)
+        """
+        super().__init__(logger)
+        self.parser = parser or default_anchor_parser()
+    
+    def _classify(self, url: str, href: str, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Classifica uma âncora como Anexo I ou Anexo II em uma única passada.
+        
+        Returns:
+            Tupla (nome_do_arquivo, url_do_arquivo) ou None se não for um anexo
+        """
+        href_lower = href.lower()
+        if not href_lower.endswith('.pdf'):
+            return None
+        text_lower = text.lower()
+        
+        # Critério mais amplo para encontrar anexos: 
+        # - Links que contenham "Anexo" no texto e terminem com .pdf
+        # - Links que contenham "Anexo" no href e terminem com .pdf
+        # - Quaisquer links que pareçam relevantes e terminem com .pdf
+        if not ('anexo' in text_lower or 'anexo' in href_lower or
+                ('rol' in text_lower and 'i' in text_lower)):
+            return None
+        
+        # Garante que a URL está completa
+        full_url = urljoin(url, href)
+        
+        # Analisa o nome ou URL para identificar se é Anexo I ou Anexo II
+        is_anexo_i = bool(self.ANEXO_I_TEXT.search(text_lower) or self.ANEXO_I_HREF.search(href_lower))
+        is_anexo_ii = bool(self.ANEXO_II_TEXT.search(text_lower) or self.ANEXO_II_HREF.search(href_lower))
+        
+        # Se não estiver explícito no texto, tenta identificar por outros padrões
+        if not (is_anexo_i or is_anexo_ii):
+            file_name = self._extract_filename(text, full_url).lower()
+            if self.ANEXO_I_NAME.search(file_name):
+                is_anexo_i = True
+            elif self.ANEXO_II_NAME.search(file_name):
+                is_anexo_ii = True
+        
+        # Renomeia explicitamente se identificou o tipo de anexo
+        if is_anexo_i:
+            return 'Anexo_I.pdf', full_url
+        if is_anexo_ii:
+            return 'Anexo_II.pdf', full_url
+        return None
     
     def extract_links(self, url: str) -> List[Tuple[str, str]]:
         """
         Extrai links de PDFs de uma página estática.
         
+        O HTML é processado à medida que chega da rede e cada âncora é
+        classificada no mesmo passo, sem montar a árvore completa da página.
+        
         Args:
             url: URL para extrair os links
             
         Returns:
             Uma lista de tuplas contendo (nome_do_arquivo, url_do_arquivo)
         """
-        self.logger.info(f"Acessando a URL: {url}")
+        self.logger.info(f"Acessando a URL: {url} (parser: {self.parser.name})")
         
         try:
             # Adiciona headers para evitar bloqueio
@@ -95,57 +266,22 @@ class StaticWebScraper(WebScraper):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Debug: imprimir todos os links encontrados para análise
-            all_links = [(link.get_text().strip(), link.get('href')) 
-                        for link in soup.find_all('a', href=True)]
-            self.logger.info(f"Total de links encontrados: {len(all_links)}")
-            
-            # Estratégia mais ampla para encontrar anexos
-            pdf_links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                text = link.get_text().strip()
+            with requests.get(url, headers=headers, stream=True) as response:
+                response.raise_for_status()
                 
-                # Critério mais amplo para encontrar anexos: 
-                # - Links que contenham "Anexo" no texto e terminem com .pdf
-                # - Links que contenham "Anexo" no href e terminem com .pdf
-                # - Quaisquer links que pareçam relevantes e terminem com .pdf
-                if href.lower().endswith('.pdf') and (
-                    'anexo' in text.lower() or 
-                    'anexo' in href.lower() or
-                    ('rol' in text.lower() and ('i' in text.lower() or 'ii' in text.lower()))
-                ):
-                    # Garante que a URL está completa
-                    full_url = urljoin(url, href)
-                    file_name = self._extract_filename(text, full_url)
-                    
-                    # Analisa o nome ou URL para identificar se é Anexo I ou Anexo II
-                    is_anexo_i = 'anexo i' in text.lower() or 'anexo_i' in href.lower() or 'anexoi' in href.lower()
-                    is_anexo_ii = 'anexo ii' in text.lower() or 'anexo_ii' in href.lower() or 'anexoii' in href.lower()
-                    
-                    # Se não estiver explícito no texto, tenta identificar por outros padrões
-                    if not (is_anexo_i or is_anexo_ii):
-                        if 'i.' in file_name.lower() or '_i_' in file_name.lower():
-                            is_anexo_i = True
-                        elif 'ii.' in file_name.lower() or '_ii_' in file_name.lower():
-                            is_anexo_ii = True
-                    
-                    # Renomeia explicitamente se identificou o tipo de anexo
-                    if is_anexo_i:
-                        file_name = 'Anexo_I.pdf'
-                    elif is_anexo_ii:
-                        file_name = 'Anexo_II.pdf'
-                    
-                    # Adiciona à lista se for identificado como um dos anexos desejados
-                    if is_anexo_i or is_anexo_ii:
-                        pdf_links.append((file_name, full_url))
-                        self.logger.info(f"Encontrado link: {file_name} - {full_url}")
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                chunks = (decoder.decode(chunk) for chunk in response.iter_content(chunk_size=64 * 1024))
+                
+                total_links = 0
+                pdf_links = []
+                for href, text in self.parser.parse(chunks):
+                    total_links += 1
+                    link = self._classify(url, href, text)
+                    if link:
+                        pdf_links.append(link)
+                        self.logger.info(f"Encontrado link: {link[0]} - {link[1]}")
             
+            self.logger.info(f"Total de links encontrados: {total_links}")
             return pdf_links
         
         except Exception as e:
@@ -177,15 +313,26 @@ class StaticWebScraper(WebScraper):
         return clean_text
 
 
-class DynamicWebScraper(WebScraper):
-    """Implementação de web scraper para páginas dinâmicas usando Selenium."""
+class DriverPool:
+    """Pool de instâncias do Chrome headless mantidas abertas entre extrações."""
     
-    def __init__(self, logger: Logger):
-        super().__init__(logger)
-        self.driver = None
+    def __init__(self, logger: Logger, size: int = 1):
+        """
+        Inicializa o pool de drivers.
+        
+        Args:
+            logger: Logger da aplicação
+            size: Número máximo de navegadores abertos ao mesmo tempo
+        """
+        self.logger = logger
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[webdriver.Chrome]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._drivers: List[webdriver.Chrome] = []
+        self._lock = threading.Lock()
     
-    def _initialize_driver(self) -> None:
-        """Inicializa o driver do Selenium com as configurações apropriadas."""
+    def _create_driver(self) -> webdriver.Chrome:
+        """Cria um driver do Selenium com as configurações apropriadas."""
         chrome_options = Options()
         chrome_options.add_argument("--headless")  # Para execução sem interface gráfica
         chrome_options.add_argument("--disable-gpu")
@@ -194,7 +341,115 @@ class DynamicWebScraper(WebScraper):
         chrome_options.add_argument("--window-size=1920,1080")  # Ajuste para melhor renderização
         chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
         
-        self.driver = webdriver.Chrome(options=chrome_options)
+        self.logger.info("Iniciando nova instância do Chrome headless")
+        driver = webdriver.Chrome(options=chrome_options)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+    
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        """Encerra um driver que não pode mais ser reutilizado."""
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        """
+        Empresta um driver aquecido do pool, criando um novo só quando necessário.
+        
+        Drivers que falharem durante o uso são descartados em vez de devolvidos.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create_driver()
+            
+            try:
+                yield driver
+            except Exception:
+                self._discard(driver)
+                raise
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+    
+    def close(self) -> None:
+        """Encerra todos os navegadores abertos pelo pool."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.LifoQueue()
+
+
+class DynamicWebScraper(WebScraper):
+    """Implementação de web scraper para páginas dinâmicas usando Selenium."""
+    
+    # Coleta href e texto de todas as âncoras em uma única chamada ao navegador
+    COLLECT_LINKS_JS = """
+        return Array.from(document.querySelectorAll('a[href]'),
+                          a => [a.href, (a.innerText || a.textContent || '').trim()]);
+    """
+    
+    # Quantidade de âncoras e de recursos carregados, usada para detectar a rede ociosa
+    PAGE_ACTIVITY_JS = """
+        return [document.readyState,
+                document.getElementsByTagName('a').length,
+                performance.getEntriesByType('resource').length];
+    """
+    
+    def __init__(self, logger: Logger, driver_pool: Optional[DriverPool] = None,
+                 ready_timeout: float = 10.0):
+        """
+        Inicializa o scraper dinâmico.
+        
+        Args:
+            logger: Logger da aplicação
+            driver_pool: Pool de drivers compartilhado (um pool próprio é criado se omitido)
+            ready_timeout: Tempo máximo, em segundos, esperando a página estabilizar
+        """
+        super().__init__(logger)
+        self.driver_pool = driver_pool or DriverPool(logger)
+        self.ready_timeout = ready_timeout
+    
+    def _wait_until_ready(self, driver: webdriver.Chrome) -> None:
+        """
+        Espera a página ficar pronta sem pausas fixas.
+        
+        Considera a página pronta quando o documento terminou de carregar e o
+        número de âncoras e de requisições de recursos para de crescer entre
+        duas verificações consecutivas.
+        """
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        
+        # Scroll para disparar o carregamento de elementos tardios
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        
+        last_activity = [None]
+        
+        def page_is_idle(d: webdriver.Chrome) -> bool:
+            activity = d.execute_script(self.PAGE_ACTIVITY_JS)
+            idle = activity[0] == 'complete' and activity[1] > 0 and activity == last_activity[0]
+            last_activity[0] = activity
+            return idle
+        
+        try:
+            WebDriverWait(driver, self.ready_timeout, poll_frequency=0.25).until(page_is_idle)
+        except TimeoutException:
+            self.logger.warning("Página não estabilizou dentro do tempo limite; seguindo com o conteúdo atual")
     
     def extract_links(self, url: str) -> List[Tuple[str, str]]:
         """
@@ -206,167 +461,809 @@ class DynamicWebScraper(WebScraper):
         Returns:
             Uma lista de tuplas contendo (nome_do_arquivo, url_do_arquivo)
         """
-        if not self.driver:
-            self._initialize_driver()
-            
         self.logger.info(f"Acessando a URL com Selenium: {url}")
         
         try:
-            self.driver.get(url)
-            
-            # Espera a página carregar completamente
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Scroll para garantir que todos os elementos são carregados
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            with self.driver_pool.driver() as driver:
+                driver.get(url)
+                self._wait_until_ready(driver)
+                anchors = driver.execute_script(self.COLLECT_LINKS_JS)
             
-            # Log do conteúdo da página para debug
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            all_links = soup.find_all('a', href=True)
-            self.logger.info(f"Total de links encontrados com Selenium: {len(all_links)}")
+            self.logger.info(f"Total de links encontrados com Selenium: {len(anchors)}")
             
             # Encontra links para PDFs que possam conter anexos
             pdf_links = []
-            elements = self.driver.find_elements(By.TAG_NAME, "a")
             
-            for element in elements:
-                try:
-                    href = element.get_attribute("href")
-                    text = element.text.strip()
+            for href, text in anchors:
+                if href and href.lower().endswith('.pdf'):
+                    self.logger.info(f"Link PDF encontrado: {text} - {href}")
                     
-                    if href and href.lower().endswith('.pdf'):
-                        self.logger.info(f"Link PDF encontrado: {text} - {href}")
-                        
-                        # Critérios mais amplos para identificar anexos
-                        is_anexo_i = False
-                        is_anexo_ii = False
-                        
-                        if 'anexo' in text.lower() or 'anexo' in href.lower():
-                            if 'i' in text.lower() and not 'ii' in text.lower():
-                                is_anexo_i = True
-                            elif 'ii' in text.lower():
-                                is_anexo_ii = True
-                            
-                            # Se não está explícito, tenta inferir pelo conteúdo da URL ou texto
-                            if not (is_anexo_i or is_anexo_ii):
-                                if 'rol' in text.lower() or 'procedimento' in text.lower():
-                                    # Primeiro link relevante como Anexo I, segundo como Anexo II
-                                    if not pdf_links:
-                                        is_anexo_i = True
-                                    else:
-                                        is_anexo_ii = True
+                    # Critérios mais amplos para identificar anexos
+                    is_anexo_i = False
+                    is_anexo_ii = False
+                    
+                    if 'anexo' in text.lower() or 'anexo' in href.lower():
+                        if 'i' in text.lower() and not 'ii' in text.lower():
+                            is_anexo_i = True
+                        elif 'ii' in text.lower():
+                            is_anexo_ii = True
                         
-                        if is_anexo_i:
-                            file_name = 'Anexo_I.pdf'
-                            pdf_links.append((file_name, href))
-                            self.logger.info(f"Identificado como Anexo I: {href}")
-                        elif is_anexo_ii:
-                            file_name = 'Anexo_II.pdf'
-                            pdf_links.append((file_name, href))
-                            self.logger.info(f"Identificado como Anexo II: {href}")
-                
-                except Exception as e:
-                    self.logger.warning(f"Erro ao processar elemento: {str(e)}")
+                        # Se não está explícito, tenta inferir pelo conteúdo da URL ou texto
+                        if not (is_anexo_i or is_anexo_ii):
+                            if 'rol' in text.lower() or 'procedimento' in text.lower():
+                                # Primeiro link relevante como Anexo I, segundo como Anexo II
+                                if not pdf_links:
+                                    is_anexo_i = True
+                                else:
+                                    is_anexo_ii = True
+                    
+                    if is_anexo_i:
+                        file_name = 'Anexo_I.pdf'
+                        pdf_links.append((file_name, href))
+                        self.logger.info(f"Identificado como Anexo I: {href}")
+                    elif is_anexo_ii:
+                        file_name = 'Anexo_II.pdf'
+                        pdf_links.append((file_name, href))
+                        self.logger.info(f"Identificado como Anexo II: {href}")
             
             # Se não encontrou anexos específicos, considera os primeiros dois PDFs como anexos
             if len(pdf_links) < 2:
                 pdf_count = 0
-                for element in elements:
-                    try:
-                        href = element.get_attribute("href")
-                        if href and href.lower().endswith('.pdf'):
-                            # Evita duplicação se já adicionou
-                            if not any(href == url for _, url in pdf_links):
-                                if pdf_count == 0:
-                                    pdf_links.append(('Anexo_I.pdf', href))
-                                    self.logger.info(f"Adicionando PDF como Anexo I: {href}")
-                                    pdf_count += 1
-                                elif pdf_count == 1:
-                                    pdf_links.append(('Anexo_II.pdf', href))
-                                    self.logger.info(f"Adicionando PDF como Anexo II: {href}")
-                                    pdf_count += 1
-                                    break  # Já temos os dois anexos
-                    except Exception:
-                        continue
+                for href, _ in anchors:
+                    if href and href.lower().endswith('.pdf'):
+                        # Evita duplicação se já adicionou
+                        if not any(href == url for _, url in pdf_links):
+                            if pdf_count == 0:
+                                pdf_links.append(('Anexo_I.pdf', href))
+                                self.logger.info(f"Adicionando PDF como Anexo I: {href}")
+                                pdf_count += 1
+                            elif pdf_count == 1:
+                                pdf_links.append(('Anexo_II.pdf', href))
+                                self.logger.info(f"Adicionando PDF como Anexo II: {href}")
+                                pdf_count += 1
+                                break  # Já temos os dois anexos
             
             return pdf_links
             
         except Exception as e:
             self.logger.error(f"Erro ao acessar a URL com Selenium: {str(e)}")
             return []
-        finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+    
+    def close(self) -> None:
+        """Encerra os navegadores mantidos pelo pool."""
+        self.driver_pool.close()
+
+
+class CrawlRule:
+    """Ponto de partida do crawler e o padrão dos arquivos a coletar a partir dele."""
+    
+    def __init__(self, start_url: str, file_pattern: str, max_depth: int = 2, target_dir: str = ""):
+        """
+        Args:
+            start_url: URL inicial; só são seguidas páginas abaixo dela
+            file_pattern: Expressão regular aplicada à URL para selecionar arquivos
+            max_depth: Profundidade máxima de páginas a partir da URL inicial
+            target_dir: Subdiretório de destino dos arquivos encontrados
+        """
+        self.start_url = start_url if start_url.endswith('/') else start_url + '/'
+        self.file_pattern = re.compile(file_pattern, re.IGNORECASE)
+        self.max_depth = max_depth
+        self.target_dir = target_dir
+    
+    def file_name(self, file_url: str) -> str:
+        """Nome relativo do arquivo, preservando a estrutura de diretórios do site."""
+        path = unquote(urlparse(file_url).path)
+        start_path = unquote(urlparse(self.start_url).path)
+        relative = path[len(start_path):] if path.startswith(start_path) else os.path.basename(path)
+        parts = [part for part in relative.split('/') if part and part not in ('.', '..')]
+        return os.path.join(self.target_dir, *parts)
+
+
+class WebCrawler(WebScraper):
+    """
+    Crawler concorrente para árvores de páginas e listagens de diretório.
+    
+    Percorre as páginas em largura a partir de cada regra, respeitando limites
+    de profundidade, domínio, páginas visitadas e tempo, com concorrência e
+    intervalo mínimo entre requisições por host.
+    """
+    
+    def __init__(self, logger: Logger,
+                 parser: Optional[AnchorParser] = None,
+                 session: Optional[requests.Session] = None,
+                 allowed_domains: Optional[List[str]] = None,
+                 max_pages: int = 500,
+                 max_workers: int = 4,
+                 max_per_host: int = 2,
+                 politeness_delay: float = 0.5,
+                 time_budget: Optional[float] = None):
+        """
+        Inicializa o crawler.
+        
+        Args:
+            logger: Logger da aplicação
+            parser: Backend de parsing das páginas (o mais rápido disponível se omitido)
+            session: Sessão HTTP compartilhada (uma nova é criada se omitida)
+            allowed_domains: Domínios permitidos (padrão: os domínios das URLs iniciais)
+            max_pages: Número máximo de páginas visitadas por execução
+            max_workers: Número máximo de páginas buscadas simultaneamente
+            max_per_host: Número máximo de requisições simultâneas por host
+            politeness_delay: Intervalo mínimo, em segundos, entre requisições ao mesmo host
+            time_budget: Tempo máximo, em segundos, para o crawl (None para sem limite)
+        """
+        super().__init__(logger)
+        self.parser = parser or default_anchor_parser()
+        self.session = session or requests.Session()
+        self.allowed_domains = allowed_domains
+        self.max_pages = max_pages
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.politeness_delay = politeness_delay
+        self.time_budget = time_budget
+        
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_request: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(url: str) -> str:
+        """Remove fragmento e query (ordenações de listagens) para deduplicar URLs."""
+        url, _ = urldefrag(url)
+        return url.split('?', 1)[0]
+    
+    def _wait_turn(self, host: str) -> threading.BoundedSemaphore:
+        """Aguarda o intervalo de cortesia do host e retorna o semáforo do host."""
+        with self._lock:
+            semaphore = self._host_limits.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+            now = time.monotonic()
+            start = max(now, self._next_request.get(host, now))
+            self._next_request[host] = start + self.politeness_delay
+        if start > now:
+            time.sleep(start - now)
+        return semaphore
+    
+    def _fetch_anchors(self, page_url: str) -> List[Tuple[str, str]]:
+        """Busca uma página e retorna suas âncoras; conteúdos não HTML são ignorados."""
+        host = urlparse(page_url).netloc
+        with self._wait_turn(host):
+            headers = {'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'}
+            with self.session.get(page_url, stream=True, headers=headers, timeout=30) as response:
+                response.raise_for_status()
+                if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    return []
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                chunks = (decoder.decode(chunk) for chunk in response.iter_content(chunk_size=64 * 1024))
+                return list(self.parser.parse(chunks))
+    
+    def crawl(self, rules: List[CrawlRule]) -> List[Tuple[str, str]]:
+        """
+        Percorre as páginas a partir das regras e seleciona os arquivos.
+        
+        Args:
+            rules: Regras com URLs iniciais e padrões de arquivo
+            
+        Returns:
+            Uma lista de tuplas contendo (nome_do_arquivo, url_do_arquivo)
+        """
+        allowed_domains = set(self.allowed_domains or [urlparse(rule.start_url).netloc for rule in rules])
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        
+        frontier = deque((self._normalize(rule.start_url), 0, rule) for rule in rules)
+        visited = set()
+        files: Dict[str, str] = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier:
+                if deadline and time.monotonic() > deadline:
+                    self.logger.warning(f"Tempo limite do crawler atingido; {len(frontier)} página(s) não visitada(s)")
+                    break
+                
+                # Processa a fronteira em lotes, buscando as páginas do lote em paralelo
+                batch = []
+                while frontier and len(batch) < self.max_workers * 4:
+                    page_url, depth, rule = frontier.popleft()
+                    if page_url in visited:
+                        continue
+                    if len(visited) >= self.max_pages:
+                        self.logger.warning(f"Limite de {self.max_pages} páginas atingido")
+                        frontier.clear()
+                        break
+                    visited.add(page_url)
+                    batch.append((page_url, depth, rule))
+                
+                results = executor.map(lambda item: self._safe_fetch(item[0]), batch)
+                for (page_url, depth, rule), anchors in zip(batch, results):
+                    for href, _ in anchors:
+                        link = self._normalize(urljoin(page_url, href))
+                        if urlparse(link).netloc not in allowed_domains:
+                            continue
+                        
+                        if rule.file_pattern.search(link):
+                            if link not in files:
+                                files[link] = rule.file_name(link)
+                                self.logger.info(f"Arquivo encontrado: {files[link]} - {link}")
+                        elif (depth < rule.max_depth and link.startswith(rule.start_url)
+                              and link not in visited):
+                            frontier.append((link, depth + 1, rule))
+        
+        self.logger.info(f"Crawler visitou {len(visited)} página(s) e encontrou {len(files)} arquivo(s)")
+        return [(file_name, file_url) for file_url, file_name in files.items()]
+    
+    def _safe_fetch(self, page_url: str) -> List[Tuple[str, str]]:
+        """Busca uma página registrando erros sem interromper o crawl."""
+        try:
+            return self._fetch_anchors(page_url)
+        except Exception as e:
+            self.logger.warning(f"Erro ao visitar {page_url}: {str(e)}")
+            return []
+    
+    def extract_links(self, url: str) -> List[Tuple[str, str]]:
+        """
+        Extrai links de PDFs e arquivos de dados abaixo de uma URL.
+        
+        Args:
+            url: URL inicial do crawl
+            
+        Returns:
+            Uma lista de tuplas contendo (nome_do_arquivo, url_do_arquivo)
+        """
+        return self.crawl([CrawlRule(url, r'\.(pdf|zip|csv)$')])
+
+
+class DownloadCache:
+    """Manifesto persistente com ETag, Last-Modified e SHA-256 de cada URL baixada."""
+    
+    def __init__(self, cache_file: str, logger: Logger):
+        self.cache_file = cache_file
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Carrega o manifesto do disco, ignorando arquivos corrompidos."""
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Cache de downloads inválido, será recriado: {str(e)}")
+            return {}
+    
+    def get(self, file_url: str) -> Optional[Dict[str, Any]]:
+        """Retorna a entrada da URL, se o arquivo correspondente ainda existir."""
+        with self._lock:
+            entry = self.entries.get(file_url)
+        if entry and os.path.exists(entry.get('file_path', '')):
+            return entry
+        return None
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Monta os headers If-None-Match/If-Modified-Since a partir de uma entrada."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def update(self, file_url: str, file_path: str, sha256: str,
+               headers: Dict[str, str]) -> None:
+        """Atualiza a entrada da URL e grava o manifesto de forma atômica."""
+        with self._lock:
+            previous = self.entries.get(file_url, {})
+            self.entries[file_url] = {
+                'file_path': file_path,
+                'sha256': sha256,
+                'size': os.path.getsize(file_path),
+                # Em respostas 304 os validadores podem vir omitidos
+                'etag': headers.get('ETag') or previous.get('etag', ''),
+                'last_modified': headers.get('Last-Modified') or previous.get('last_modified', ''),
+            }
+            tmp_path = f"{self.cache_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_file)
+
+
+def file_sha256(file_path: str) -> str:
+    """Calcula o SHA-256 de um arquivo em disco."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadProgress:
+    """Acompanha o progresso agregado de vários downloads simultâneos."""
+    
+    def __init__(self, total_files: int, logger: Logger):
+        self.total_files = total_files
+        self.logger = logger
+        self.completed_files = 0
+        self.failed_files = 0
+        self.total_bytes = 0
+        self.start_time = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def add_bytes(self, size: int) -> None:
+        """Contabiliza bytes recebidos por qualquer um dos workers."""
+        with self._lock:
+            self.total_bytes += size
+    
+    def finish_file(self, file_name: str, success: bool) -> None:
+        """Registra o término de um arquivo e loga o progresso geral."""
+        with self._lock:
+            if success:
+                self.completed_files += 1
+            else:
+                self.failed_files += 1
+            done = self.completed_files + self.failed_files
+            elapsed = max(time.monotonic() - self.start_time, 1e-6)
+            megabytes = self.total_bytes / (1024 * 1024)
+            self.logger.info(
+                f"Progresso: {done}/{self.total_files} arquivos "
+                f"({self.failed_files} falha(s)), {megabytes:.2f} MB em {elapsed:.1f}s "
+                f"({megabytes / elapsed:.2f} MB/s) - último: {file_name}"
+            )
 
 
 class FileDownloader:
     """Classe responsável pelo download de arquivos."""
     
-    def __init__(self, output_dir: str, logger: Logger):
+    MIN_CHUNK_SIZE = 16 * 1024
+    INITIAL_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 4 * 1024 * 1024
+    
+    # Headers da resposta guardados no estado parcial e no cache
+    TRACKED_HEADERS = ('ETag', 'Last-Modified', 'Digest', 'Repr-Digest')
+    
+    def __init__(self, output_dir: str, logger: Logger,
+                 max_workers: int = 4, max_per_host: int = 2,
+                 cache_file: Optional[str] = None,
+                 max_retries: int = 3,
+                 range_parts: int = 1,
+                 split_threshold: int = 8 * 1024 * 1024):
+        """
+        Inicializa o downloader.
+        
+        Args:
+            output_dir: Diretório para salvar os arquivos
+            logger: Logger da aplicação
+            max_workers: Número máximo de downloads simultâneos
+            max_per_host: Número máximo de downloads simultâneos por host
+            cache_file: Manifesto do cache de downloads (padrão: .download_cache.json em output_dir)
+            max_retries: Tentativas de retomada por faixa de bytes antes de desistir
+            range_parts: Número de faixas paralelas usadas para arquivos grandes (1 desativa)
+            split_threshold: Tamanho mínimo, em bytes, para dividir um arquivo em faixas
+        """
         self.output_dir = output_dir
         self.logger = logger
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.max_retries = max(1, max_retries)
+        self.range_parts = max(1, range_parts)
+        self.split_threshold = split_threshold
+        
+        # Sessão única com pool de conexões keep-alive compartilhado entre os workers
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'application/pdf'
+        })
+        adapter = HTTPAdapter(pool_connections=self.max_workers,
+                              pool_maxsize=self.max_workers * self.range_parts)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
         
         # Cria o diretório de saída, se necessário
         os.makedirs(output_dir, exist_ok=True)
+        
+        self.cache = DownloadCache(cache_file or os.path.join(output_dir, ".download_cache.json"), logger)
     
-    def download_file(self, file_url: str, file_name: str) -> Optional[str]:
+    def _host_semaphore(self, file_url: str) -> threading.BoundedSemaphore:
+        """Retorna o semáforo que limita a concorrência para o host da URL."""
+        host = urlparse(file_url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
+    
+    def _place_file(self, tmp_path: str, file_name: str, sha256: str,
+                    entry: Optional[Dict[str, Any]]) -> str:
         """
-        Faz o download de um arquivo, garantindo que os nomes sejam únicos.
+        Move o arquivo temporário para o destino final.
+        
+        Reaproveita o arquivo existente quando o conteúdo é idêntico e só gera
+        um nome novo quando o destino pertence a outro arquivo.
         """
-        file_path = os.path.join(self.output_dir, file_name)
-
-        # Se já existir um arquivo com o mesmo nome, gera um novo nome
         base_name, ext = os.path.splitext(file_name)
-        counter = 1
-        while os.path.exists(file_path):
-            file_path = os.path.join(self.output_dir, f"{base_name}_I{ext}")
-            counter += 1
-
-        self.logger.info(f"Baixando {file_url} para {file_path}")
-
+        file_path = os.path.join(self.output_dir, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        with self._lock:
+            # Conteúdo igual ao já registrado para esta URL
+            if entry and entry.get('sha256') == sha256:
+                os.remove(tmp_path)
+                return entry['file_path']
+            
+            # Versão nova da mesma URL substitui o arquivo anterior
+            if entry:
+                os.replace(tmp_path, entry['file_path'])
+                return entry['file_path']
+            
+            # Se já existir um arquivo com o mesmo nome, compara o conteúdo antes de gerar um novo nome
+            while os.path.exists(file_path):
+                if file_sha256(file_path) == sha256:
+                    os.remove(tmp_path)
+                    return file_path
+                base_name = f"{base_name}_I"
+                file_path = os.path.join(self.output_dir, f"{base_name}{ext}")
+            
+            os.replace(tmp_path, file_path)
+            return file_path
+    
+    def _partial_base(self, file_url: str) -> str:
+        """Prefixo dos arquivos de download parcial de uma URL."""
+        key = hashlib.sha256(file_url.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.output_dir, f".{key}")
+    
+    def _load_partial_state(self, base: str) -> Optional[Dict[str, Any]]:
+        """Carrega o estado de um download interrompido, se houver."""
+        state_path = f"{base}.json"
+        if not os.path.exists(state_path):
+            return None
         try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            self._discard_partial(base)
+            return None
+    
+    @staticmethod
+    def _save_partial_state(base: str, state: Dict[str, Any]) -> None:
+        """Grava o estado do download parcial para permitir a retomada."""
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+    
+    @staticmethod
+    def _discard_partial(base: str) -> None:
+        """Remove o estado e todas as faixas parciais de uma URL."""
+        for path in [f"{base}.json"] + glob.glob(f"{glob.escape(base)}.part*"):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _new_partial_state(self, file_url: str, response: requests.Response) -> Dict[str, Any]:
+        """Monta o estado parcial a partir da primeira resposta do servidor."""
+        content_length = response.headers.get('Content-Length')
+        total_size = int(content_length) if content_length and content_length.isdigit() else None
+        
+        parts = 1
+        if (self.range_parts > 1 and total_size and total_size >= self.split_threshold
+                and response.headers.get('Accept-Ranges', '').lower() == 'bytes'):
+            parts = self.range_parts
+        
+        return {
+            'url': file_url,
+            'total_size': total_size,
+            'parts': parts,
+            'headers': {name: response.headers.get(name, '') for name in self.TRACKED_HEADERS},
+        }
+    
+    @staticmethod
+    def _part_ranges(base: str, state: Dict[str, Any]) -> List[Tuple[str, int, Optional[int]]]:
+        """Divide o arquivo em faixas (caminho, início, fim inclusivo)."""
+        total_size = state['total_size']
+        parts = state['parts']
+        if parts == 1:
+            return [(f"{base}.part", 0, total_size - 1 if total_size else None)]
+        
+        part_size = -(-total_size // parts)
+        return [
+            (f"{base}.part{index}", start, min(start + part_size, total_size) - 1)
+            for index, start in enumerate(range(0, total_size, part_size))
+        ]
+    
+    def _stream_to_file(self, response: requests.Response, part_path: str, mode: str,
+                        progress: Optional[DownloadProgress]) -> None:
+        """
+        Grava o corpo da resposta com tamanho de bloco adaptativo.
+        
+        O bloco dobra enquanto as leituras retornam cheias e rápidas e é reduzido
+        quando o link fica lento, para que uma queda perca pouco trabalho.
+        """
+        chunk_size = self.INITIAL_CHUNK_SIZE
+        with open(part_path, mode) as f:
+            while True:
+                started = time.monotonic()
+                chunk = response.raw.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                if progress:
+                    progress.add_bytes(len(chunk))
+                
+                elapsed = time.monotonic() - started
+                if len(chunk) == chunk_size and elapsed < 0.05:
+                    chunk_size = min(chunk_size * 2, self.MAX_CHUNK_SIZE)
+                elif elapsed > 0.5:
+                    chunk_size = max(chunk_size // 2, self.MIN_CHUNK_SIZE)
+    
+    def _fetch_range(self, file_url: str, base: str, state: Dict[str, Any],
+                     part: Tuple[str, int, Optional[int]],
+                     progress: Optional[DownloadProgress]) -> bool:
+        """
+        Baixa uma faixa de bytes, retomando com Range a partir do que já está em disco.
+        
+        Returns:
+            True se a faixa foi baixada por completo, False após esgotar as tentativas
+        """
+        part_path, start, end = part
+        expected_size = end - start + 1 if end is not None else None
+        
+        for attempt in range(1, self.max_retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if expected_size is not None and offset >= expected_size:
+                return True
+            
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/pdf'
+                'Accept-Encoding': 'identity',
+                'Range': f"bytes={start + offset}-{'' if end is None else end}",
             }
+            validator = state['headers'].get('ETag') or state['headers'].get('Last-Modified')
+            if validator:
+                headers['If-Range'] = validator
             
-            response = requests.get(file_url, stream=True, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            if os.path.getsize(file_path) == 0:
-                self.logger.error(f"Arquivo baixado está vazio: {file_path}")
-                os.remove(file_path)
+            try:
+                with self.session.get(file_url, stream=True, headers=headers, timeout=30) as response:
+                    response.raise_for_status()
+                    
+                    if response.status_code == 206:
+                        self._stream_to_file(response, part_path, 'ab', progress)
+                    elif state['parts'] == 1:
+                        # Arquivo mudou no servidor ou Range não suportado: recomeça do zero
+                        state.update(self._new_partial_state(file_url, response))
+                        self._save_partial_state(base, state)
+                        expected_size = state['total_size']
+                        self._stream_to_file(response, part_path, 'wb', progress)
+                    else:
+                        raise ValueError("servidor ignorou a requisição Range")
+                
+                if expected_size is None or os.path.getsize(part_path) >= expected_size:
+                    return True
+            
+            except Exception as e:
+                self.logger.warning(f"Falha na tentativa {attempt}/{self.max_retries} "
+                                    f"de {file_url}: {str(e)}")
+        
+        return False
+    
+    @staticmethod
+    def _expected_sha256(headers: Dict[str, str]) -> Optional[str]:
+        """Extrai o SHA-256 anunciado pelo servidor (Repr-Digest/Digest), se houver."""
+        for name in ('Repr-Digest', 'Digest'):
+            for item in headers.get(name, '').split(','):
+                algorithm, _, encoded = item.strip().partition('=')
+                if algorithm.lower() == 'sha-256' and encoded:
+                    return base64.b64decode(encoded.strip(':')).hex()
+        return None
+    
+    def download_file(self, file_url: str, file_name: str,
+                      progress: Optional[DownloadProgress] = None) -> Optional[str]:
+        """
+        Faz o download de um arquivo, evitando transferências e cópias repetidas.
+        
+        Envia If-None-Match/If-Modified-Since com base no cache e, em caso de
+        resposta 304 ou de conteúdo idêntico (SHA-256), mantém o arquivo existente.
+        Quedas de conexão são retomadas com Range a partir do estado parcial salvo
+        em disco, inclusive entre execuções, e o arquivo só é promovido ao destino
+        final depois de conferidos o tamanho e o hash.
+        
+        Args:
+            file_url: URL do arquivo
+            file_name: Nome desejado para o arquivo
+            progress: Acompanhamento agregado opcional, usado no modo concorrente
+            
+        Returns:
+            Caminho do arquivo baixado ou None em caso de erro
+        """
+        entry = self.cache.get(file_url)
+        base = self._partial_base(file_url)
+        state = self._load_partial_state(base)
+        
+        try:
+            host_slot = self._host_semaphore(file_url)
+            with host_slot:
+                if state is None:
+                    self.logger.info(f"Baixando {file_url}")
+                    headers = self.cache.conditional_headers(entry)
+                    headers['Accept-Encoding'] = 'identity'
+                    
+                    with self.session.get(file_url, stream=True, headers=headers, timeout=30) as response:
+                        if response.status_code == 304 and entry:
+                            self.cache.update(file_url, entry['file_path'], entry['sha256'], response.headers)
+                            self.logger.info(f"Arquivo não modificado, usando cache: {entry['file_path']}")
+                            return entry['file_path']
+                        
+                        response.raise_for_status()
+                        state = self._new_partial_state(file_url, response)
+                        self._save_partial_state(base, state)
+                        
+                        # Sem divisão em faixas, aproveita o corpo desta mesma resposta
+                        if state['parts'] == 1:
+                            try:
+                                self._stream_to_file(response, f"{base}.part", 'wb', progress)
+                                if state['total_size'] is None:
+                                    state['complete'] = True
+                            except Exception as e:
+                                self.logger.warning(f"Conexão interrompida em {file_url}: {str(e)}")
+                else:
+                    self.logger.info(f"Retomando download parcial de {file_url}")
+                
+            parts = self._part_ranges(base, state)
+            
+            def fetch_part(part: Tuple[str, int, Optional[int]]) -> bool:
+                # Cada faixa ocupa uma vaga própria no limite de conexões por host
+                with host_slot:
+                    return self._fetch_range(file_url, base, state, part, progress)
+            
+            if state.get('complete'):
+                completed = True
+            elif len(parts) == 1:
+                completed = fetch_part(parts[0])
+            else:
+                self.logger.info(f"Dividindo {file_url} em {len(parts)} faixas paralelas")
+                with ThreadPoolExecutor(max_workers=min(len(parts), self.max_per_host)) as executor:
+                    completed = all(executor.map(fetch_part, parts))
+            
+            if not completed:
+                self.logger.error(f"Download de {file_url} incompleto; parcial mantido para retomada")
+                return None
+            
+            tmp_path = f"{base}.part"
+            if len(parts) > 1:
+                with open(tmp_path, 'wb') as output:
+                    for part_path, _, _ in parts:
+                        with open(part_path, 'rb') as f:
+                            while chunk := f.read(self.MAX_CHUNK_SIZE):
+                                output.write(chunk)
+            
+            # Confere tamanho e hash antes de promover o arquivo
+            size = os.path.getsize(tmp_path)
+            if size == 0:
+                self.logger.error(f"Arquivo baixado está vazio: {file_url}")
+                self._discard_partial(base)
+                return None
+            
+            if state['total_size'] is not None and size != state['total_size']:
+                self.logger.error(f"Tamanho inválido para {file_url}: "
+                                  f"{size} bytes, esperado {state['total_size']}")
+                self._discard_partial(base)
                 return None
+            
+            sha256 = file_sha256(tmp_path)
+            expected_sha256 = self._expected_sha256(state['headers'])
+            if expected_sha256 and expected_sha256 != sha256:
+                self.logger.error(f"Hash SHA-256 divergente para {file_url}")
+                self._discard_partial(base)
+                return None
+            
+            file_path = self._place_file(tmp_path, file_name, sha256, entry)
+            self._discard_partial(base)
+            self.cache.update(file_url, file_path, sha256, state['headers'])
 
             self.logger.info(f"Download concluído: {file_path}")
             return file_path
 
         except Exception as e:
             self.logger.error(f"Erro ao baixar arquivo {file_url}: {str(e)}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
             return None
+    
+    def download_files(self, links: List[Tuple[str, str]]) -> List[str]:
+        """
+        Faz o download de vários arquivos em paralelo, reutilizando as conexões da sessão.
+        
+        Args:
+            links: Lista de tuplas contendo (nome_do_arquivo, url_do_arquivo)
+            
+        Returns:
+            Caminhos dos arquivos baixados com sucesso, na mesma ordem dos links
+        """
+        if not links:
+            return []
+        
+        progress = DownloadProgress(len(links), self.logger)
+        
+        def worker(link: Tuple[str, str]) -> Optional[str]:
+            file_name, file_url = link
+            file_path = self.download_file(file_url, file_name, progress)
+            progress.finish_file(file_name, file_path is not None)
+            return file_path
+        
+        workers = min(self.max_workers, len(links))
+        self.logger.info(f"Baixando {len(links)} arquivos com {workers} workers "
+                         f"(máximo de {self.max_per_host} por host)")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(worker, links))
+        
+        # Links diferentes podem resolver para o mesmo arquivo em cache
+        return list(dict.fromkeys(file_path for file_path in results if file_path))
+    
+    def close(self) -> None:
+        """Fecha a sessão HTTP e libera as conexões do pool."""
+        self.session.close()
 
 
 class FileCompressor:
     """Classe responsável pela compactação de arquivos."""
     
-    def __init__(self, logger: Logger):
+    SAMPLE_SIZE = 64 * 1024
+    SAMPLE_COUNT = 4
+    
+    def __init__(self, logger: Logger, max_workers: Optional[int] = None,
+                 high_ratio_codec: int = zipfile.ZIP_DEFLATED):
+        """
+        Inicializa o compactador.
+        
+        Args:
+            logger: Logger da aplicação
+            max_workers: Threads usadas na amostragem dos arquivos (padrão: número de CPUs)
+            high_ratio_codec: Codec para arquivos muito compressíveis (ZIP_DEFLATED ou ZIP_BZIP2)
+        """
         self.logger = logger
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.high_ratio_codec = high_ratio_codec
+    
+    def _sample_ratio(self, file_path: str) -> float:
+        """Estima a taxa de compressão comprimindo amostras espalhadas pelo arquivo."""
+        size = os.path.getsize(file_path)
+        if size == 0:
+            return 1.0
+        
+        offsets = {min(size - 1, size * index // self.SAMPLE_COUNT) for index in range(self.SAMPLE_COUNT)}
+        raw = compressed = 0
+        with open(file_path, 'rb') as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                sample = f.read(self.SAMPLE_SIZE)
+                raw += len(sample)
+                compressed += len(zlib.compress(sample, 1))
+        return compressed / raw
+    
+    def _choose_strategy(self, file_path: str) -> Tuple[int, int]:
+        """
+        Escolhe o método e o nível de compressão de uma entrada.
+        
+        PDFs e outros formatos já comprimidos são armazenados sem compressão,
+        evitando gastar CPU em ganhos desprezíveis.
+        
+        Returns:
+            Tupla (compress_type, nível)
+        """
+        ratio = self._sample_ratio(file_path)
+        if ratio >= 0.97:
+            return zipfile.ZIP_STORED, 0
+        if ratio >= 0.85:
+            return zipfile.ZIP_DEFLATED, 1
+        if ratio < 0.5 and self.high_ratio_codec == zipfile.ZIP_BZIP2:
+            return zipfile.ZIP_BZIP2, 9
+        return zipfile.ZIP_DEFLATED, 6
     
     def compress_files(self, file_paths: List[str], output_path: str) -> bool:
         """
         Compacta uma lista de arquivos em um único arquivo ZIP.
         
+        Cada entrada recebe a estratégia indicada pela amostragem da sua
+        compressibilidade. A amostragem dos arquivos é feita em paralelo, já que
+        o zlib libera o GIL enquanto comprime.
+        
         Args:
             file_paths: Lista de caminhos dos arquivos a serem compactados
             output_path: Caminho do arquivo ZIP de saída
@@ -381,12 +1278,22 @@ class FileCompressor:
         self.logger.info(f"Compactando {len(file_paths)} arquivos para {output_path}")
         
         try:
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file_path in file_paths:
+            if len(file_paths) > 1 and self.max_workers > 1:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(file_paths))) as executor:
+                    strategies = list(executor.map(self._choose_strategy, file_paths))
+            else:
+                strategies = [self._choose_strategy(file_path) for file_path in file_paths]
+            
+            with zipfile.ZipFile(output_path, 'w') as zipf:
+                for file_path, (compress_type, level) in zip(file_paths, strategies):
                     # Adiciona apenas o nome do arquivo, não o caminho completo
                     arcname = os.path.basename(file_path)
-                    zipf.write(file_path, arcname=arcname)
-                    self.logger.info(f"Adicionado {file_path} ao arquivo ZIP")
+                    zipf.write(file_path, arcname=arcname, compress_type=compress_type,
+                               compresslevel=level if compress_type != zipfile.ZIP_STORED else None)
+                    
+                    method = {zipfile.ZIP_STORED: "STORED", zipfile.ZIP_DEFLATED: "DEFLATE",
+                              zipfile.ZIP_BZIP2: "BZIP2"}[compress_type]
+                    self.logger.info(f"Adicionado {file_path} ao arquivo ZIP ({method}, nível {level})")
             
             self.logger.info(f"Compactação concluída: {output_path}")
             return True
@@ -399,15 +1306,33 @@ class FileCompressor:
 class ANSDownloader:
     """Classe principal que coordena o processo de download e compactação."""
     
+    # Árvore de dados abertos espelhada no modo crawler
+    CRAWL_RULES = [
+        # Demonstrações contábeis trimestrais no formato AAAA/nTAAAA.zip
+        CrawlRule("https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis/",
+                  r'/\d{4}/[1-4]T\d{4}\.zip$', max_depth=1, target_dir="demonstracoes_contabeis"),
+        # Relatório de operadoras ativas (CADOP)
+        CrawlRule("https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas/",
+                  r'Relatorio_cadop\.csv$', max_depth=0, target_dir="operadoras_de_plano_de_saude_ativas"),
+    ]
+    
     def __init__(self, 
                  output_dir: str = "1.webScrapingFilipe/downloads",
-                 zip_filename: str = "anexos.zip"):
+                 zip_filename: str = "anexos.zip",
+                 max_workers: int = 4,
+                 max_per_host: int = 2,
+                 crawl_rules: Optional[List[CrawlRule]] = None,
+                 crawl_time_budget: Optional[float] = None):
         """
         Inicializa o downloader da ANS.
         
         Args:
             output_dir: Diretório para salvar os arquivos
             zip_filename: Nome do arquivo ZIP de saída
+            max_workers: Número máximo de downloads simultâneos
+            max_per_host: Número máximo de downloads simultâneos por host
+            crawl_rules: Regras do modo crawler (padrão: CRAWL_RULES)
+            crawl_time_budget: Tempo máximo, em segundos, para o crawl
         """
         self.url = "https://www.gov.br/ans/pt-br/acesso-a-informacao/participacao-da-sociedade/atualizacao-do-rol-de-procedimentos"
         self.output_dir = output_dir
@@ -419,8 +1344,16 @@ class ANSDownloader:
         # Inicializa os outros componentes
         self.static_scraper = StaticWebScraper(self.logger)
         self.dynamic_scraper = DynamicWebScraper(self.logger)
-        self.downloader = FileDownloader(output_dir, self.logger)
+        self.downloader = FileDownloader(output_dir, self.logger,
+                                         max_workers=max_workers,
+                                         max_per_host=max_per_host)
         self.compressor = FileCompressor(self.logger)
+        self.crawl_rules = crawl_rules or self.CRAWL_RULES
+        self.crawler = WebCrawler(self.logger,
+                                  session=self.downloader.session,
+                                  max_workers=max_workers,
+                                  max_per_host=max_per_host,
+                                  time_budget=crawl_time_budget)
     
     def run(self) -> bool:
         """
@@ -455,12 +1388,8 @@ class ANSDownloader:
         for name, url in links:
             self.logger.info(f"Link encontrado: {name} - {url}")
         
-        # Faz o download dos arquivos
-        downloaded_files = []
-        for file_name, file_url in links:
-            file_path = self.downloader.download_file(file_url, file_name)
-            if file_path:
-                downloaded_files.append(file_path)
+        # Faz o download dos arquivos em paralelo
+        downloaded_files = self.downloader.download_files(links)
         
         if not downloaded_files:
             self.logger.error("Nenhum arquivo foi baixado com sucesso.")
@@ -479,6 +1408,29 @@ class ANSDownloader:
         else:
             self.logger.error("Falha ao compactar os arquivos.")
             return False
+    
+    def run_crawl(self) -> bool:
+        """
+        Espelha a árvore de dados abertos da ANS definida nas regras do crawler.
+        
+        Returns:
+            True se todos os arquivos encontrados foram baixados, False caso contrário
+        """
+        self.logger.info(f"Iniciando o crawler com {len(self.crawl_rules)} regra(s)")
+        
+        links = self.crawler.crawl(self.crawl_rules)
+        if not links:
+            self.logger.error("O crawler não encontrou nenhum arquivo.")
+            return False
+        
+        downloaded_files = self.downloader.download_files(links)
+        self.logger.info(f"{len(downloaded_files)} de {len(links)} arquivo(s) espelhado(s) em {self.output_dir}")
+        return len(downloaded_files) == len(links)
+    
+    def close(self) -> None:
+        """Libera os navegadores e as conexões HTTP mantidos entre execuções."""
+        self.dynamic_scraper.close()
+        self.downloader.close()
 
 
 if __name__ == "__main__":
@@ -486,10 +1438,23 @@ if __name__ == "__main__":
     if sys.stdout.encoding != 'utf-8':
         sys.stdout.reconfigure(encoding='utf-8')
         
-    downloader = ANSDownloader()
-    success = downloader.run()
+    parser = argparse.ArgumentParser(description="Download dos anexos do Rol e dos dados abertos da ANS")
+    parser.add_argument("--crawl", action="store_true",
+                        help="espelha as demonstrações contábeis e o CADOP em vez dos anexos do Rol")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="tempo máximo, em segundos, para o crawler")
+    args = parser.parse_args()
+    
+    downloader = ANSDownloader(crawl_time_budget=args.time_budget)
+    try:
+        success = downloader.run_crawl() if args.crawl else downloader.run()
+    finally:
+        downloader.close()
     
-    if success:
+    if args.crawl:
+        print("Espelhamento concluído com sucesso!" if success
+              else "Alguns arquivos não foram espelhados. Verifique os logs para mais detalhes.")
+    elif success:
         print(f"Download e compactação concluídos com sucesso!")
         print(f"Verifique o arquivo ZIP em: {downloader.zip_path}")
     else:
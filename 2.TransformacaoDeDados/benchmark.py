@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+import platform
+import queue as queue_module
+import tempfile
+import traceback
+from datetime import datetime, timezone
+
+import pdfplumber
+import pandas as pd
+
+from main import PDFExtractor, DataProcessor, CSVCompressor
+
+try:
+    import resource
+except ImportError:  # resource não existe no Windows; o pico de memória fica sem medição
+    resource = None
+
+# Dimensões de uma página A4 em paisagem, em pontos
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+MARGIN = 20
+COLUMN_WIDTHS = [202] + [50] * 12
+
+class SyntheticRolPDF:
+    """
+    Classe para gerar PDFs com a mesma estrutura de tabela do Anexo I do Rol
+
+    O PDF é escrito diretamente (fonte Helvetica padrão e linhas de grade), sem
+    dependências além da biblioteca padrão.
+    """
+    def __init__(self, pages: int, rows_per_page: int, seed: int = 0):
+        self.pages = pages
+        self.rows_per_page = rows_per_page
+        self.random = random.Random(seed)
+
+    def _row(self, index: int) -> list:
+        """Gera uma linha com valores no formato das colunas do Rol"""
+        choice = self.random.choice
+        return [
+            f"PROCEDIMENTO SINTÉTICO {index} - AVALIAÇÃO CLÍNICA",
+            choice(["465/2021", "428/2017", "439/2018"]),
+            choice(["01/04/2021", "02/01/2018", "01/03/2022"]),
+            choice(["OD", ""]),
+            choice(["AMB", ""]),
+            choice(["HCO", ""]),
+            choice(["HSO", ""]),
+            choice(["REF", ""]),
+            choice(["PAC", ""]),
+            choice(["", "", "1", "25", "110"]),
+            choice(["CONSULTAS", "EXAMES", "TERAPIAS", "CIRURGIAS"]),
+            choice(["GERAIS", "CLÍNICOS", "CIRÚRGICOS"]),
+            choice(["GERAIS", "DIAGNÓSTICOS"]),
+        ]
+
+    @staticmethod
+    def _text(value: str) -> bytes:
+        """Escapa o texto para uma string literal de PDF em WinAnsiEncoding"""
+        escaped = value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return escaped.encode("cp1252")
+
+    @staticmethod
+    def _wrap(value: str, width: float, font_size: float) -> list:
+        """Quebra o texto em até duas linhas que caibam na largura da célula, como no Rol"""
+        max_chars = max(1, int((width - 4) / (font_size * 0.6)))
+        lines = [""]
+        for word in value.split():
+            candidate = f"{lines[-1]} {word}".strip()
+            if len(candidate) <= max_chars or not lines[-1]:
+                lines[-1] = candidate
+            elif len(lines) < 2:
+                lines.append(word)
+            else:
+                break
+        return [line[:max_chars] for line in lines if line]
+
+    def _page_content(self, first_row: int) -> bytes:
+        """Monta o content stream de uma página: cabeçalho, linhas e grade da tabela"""
+        rows = [PDFExtractor.COLUMNS] + [self._row(first_row + i) for i in range(self.rows_per_page)]
+        row_height = min(14.0, (PAGE_HEIGHT - 2 * MARGIN) / len(rows))
+        font_size = min(5.0, (row_height - 2) / 2.2)
+        top = PAGE_HEIGHT - MARGIN
+        bottom = top - row_height * len(rows)
+
+        xs = [MARGIN]
+        for width in COLUMN_WIDTHS:
+            xs.append(xs[-1] + width)
+
+        ops = [b"0.5 w"]
+        for i in range(len(rows) + 1):
+            y = top - i * row_height
+            ops.append(f"{xs[0]} {y:.2f} m {xs[-1]} {y:.2f} l S".encode())
+        for x in xs:
+            ops.append(f"{x} {top:.2f} m {x} {bottom:.2f} l S".encode())
+
+        ops.append(f"BT /F1 {font_size:.2f} Tf".encode())
+        for i, row in enumerate(rows):
+            row_top = top - i * row_height
+            for x, width, value in zip(xs, COLUMN_WIDTHS, row):
+                for line_number, line in enumerate(self._wrap(value, width, font_size)):
+                    y = row_top - 1 - (line_number + 1) * font_size * 1.1
+                    ops.append(f"1 0 0 1 {x + 2} {y:.2f} Tm (".encode() + self._text(line) + b") Tj")
+        ops.append(b"ET")
+        return b"\n".join(ops)
+
+    def write(self, path: str):
+        """Grava o PDF no caminho informado"""
+        page_ids = [4 + 2 * i for i in range(self.pages)]
+        objects = {
+            1: b"<< /Type /Catalog /Pages 2 0 R >>",
+            2: b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % pid for pid in page_ids)
+               + b"] /Count %d >>" % self.pages,
+            3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        }
+        for i, page_id in enumerate(page_ids):
+            content = self._page_content(i * self.rows_per_page)
+            objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                                b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                                % (PAGE_WIDTH, PAGE_HEIGHT, page_id + 1))
+            objects[page_id + 1] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+            offsets = {}
+            for object_id in sorted(objects):
+                offsets[object_id] = f.tell()
+                f.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+
+            xref = f.tell()
+            f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+            for object_id in sorted(objects):
+                f.write(b"%010d 00000 n \n" % offsets[object_id])
+            f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (len(objects) + 1, xref))
+        return path
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo atual e dos workers que ele aguardou, em MB"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _stage_extraction(tmp_dir: str, pdf_path: str, workers: int, fast_path: bool):
+    extractor = PDFExtractor(pdf_path, workers=workers, fast_path=fast_path)
+    start = time.perf_counter()
+    df = extractor.extract_table()
+    elapsed = time.perf_counter() - start
+    pd.to_pickle((df, extractor.header), os.path.join(tmp_dir, "extraido.pkl"))
+    return elapsed, len(df)
+
+def _stage_processing(tmp_dir: str):
+    df, header = pd.read_pickle(os.path.join(tmp_dir, "extraido.pkl"))
+    start = time.perf_counter()
+    df = DataProcessor().clean(df, header)
+    elapsed = time.perf_counter() - start
+    df.to_pickle(os.path.join(tmp_dir, "processado.pkl"))
+    return elapsed, len(df)
+
+def _stage_compression(tmp_dir: str):
+    df = pd.read_pickle(os.path.join(tmp_dir, "processado.pkl"))
+    start = time.perf_counter()
+    CSVCompressor(tmp_dir, "benchmark").save_and_compress(df)
+    return time.perf_counter() - start, len(df)
+
+def _stage_streaming(tmp_dir: str, pdf_path: str, workers: int, fast_path: bool):
+    extractor = PDFExtractor(pdf_path, workers=workers, fast_path=fast_path)
+    processor = DataProcessor()
+    rows = 0
+
+    def frames():
+        nonlocal rows
+        for frame in extractor.iter_frames():
+            rows += len(frame)
+            yield processor.clean(frame, extractor.header)
+
+    start = time.perf_counter()
+    CSVCompressor(tmp_dir, "benchmark").save_and_compress_stream(frames())
+    return time.perf_counter() - start, rows
+
+def _run_stage(func, args, queue):
+    """Executa a etapa no processo filho e devolve tempo, linhas e o pico de memória do filho"""
+    try:
+        elapsed, rows = func(*args)
+    except Exception:
+        # A exceção pode não ser serializável; o traceback em texto basta para o processo pai
+        queue.put(("erro", traceback.format_exc()))
+    else:
+        queue.put(("ok", (elapsed, rows, peak_rss_mb())))
+
+def _stage_result(stage: str, process, queue):
+    """Espera o resultado do filho; falha em vez de travar se a etapa der erro ou o processo morrer"""
+    while True:
+        try:
+            status, result = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if process.is_alive():
+                continue
+            try:  # O filho pode ter terminado logo depois de enviar o resultado
+                status, result = queue.get(timeout=1)
+                break
+            except queue_module.Empty:
+                raise RuntimeError(f"Etapa {stage}: o processo terminou sem resultado (código de saída {process.exitcode})")
+    process.join()
+    if status == "erro":
+        raise RuntimeError(f"Etapa {stage} falhou no processo filho:\n{result}")
+    return result
+
+def measure(stage: str, pages: int, func, *args):
+    """
+    Executa uma etapa em um processo próprio e mede tempo, vazão e pico de memória
+
+    ru_maxrss é o máximo da vida inteira do processo, então cada etapa roda em um processo
+    novo para que o pico medido seja só dela. As etapas trocam os dados por arquivos no
+    diretório temporário; o tempo medido não inclui essa leitura e gravação.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_stage, args=(func, args, queue))
+    process.start()
+    elapsed, rows, peak = _stage_result(stage, process, queue)
+    return {
+        "etapa": stage,
+        "segundos": round(elapsed, 4),
+        "paginas_por_segundo": round(pages / elapsed, 2) if elapsed else None,
+        "linhas_por_segundo": round(rows / elapsed, 2) if elapsed else None,
+        "pico_rss_mb": peak,
+    }, rows
+
+def run_benchmark(pages: int, rows_per_page: int, workers: int, fast_path: bool) -> dict:
+    """Gera o PDF sintético e executa extração, processamento e compactação"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = SyntheticRolPDF(pages, rows_per_page).write(os.path.join(tmp_dir, "Anexo_I.pdf"))
+        stages = []
+
+        stats, rows = measure("extracao", pages, _stage_extraction, tmp_dir, pdf_path, workers, fast_path)
+        stages.append(stats)
+
+        stats, _ = measure("processamento", pages, _stage_processing, tmp_dir)
+        stages.append(stats)
+
+        stats, _ = measure("compactacao", pages, _stage_compression, tmp_dir)
+        stages.append(stats)
+
+        stats, _ = measure("pipeline_streaming", pages, _stage_streaming, tmp_dir, pdf_path, workers, fast_path)
+        stages.append(stats)
+
+    return {
+        "data": datetime.now(timezone.utc).isoformat(),
+        "parametros": {"paginas": pages, "linhas_por_pagina": rows_per_page,
+                       "workers": workers, "fast_path": fast_path},
+        "versoes": {"python": platform.python_version(), "pdfplumber": pdfplumber.__version__,
+                    "pandas": pd.__version__},
+        "linhas_extraidas": rows,
+        "etapas": stages,
+    }
+
+def compare(current: dict, previous_path: str):
+    """Mostra a variação de tempo de cada etapa em relação a uma execução anterior"""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {stage["etapa"]: stage for stage in json.load(f)["etapas"]}
+
+    for stage in current["etapas"]:
+        before = previous.get(stage["etapa"])
+        if before and before["segundos"]:
+            change = (stage["segundos"] / before["segundos"] - 1) * 100
+            print(f"{stage['etapa']:>20}: {before['segundos']:.3f}s -> {stage['segundos']:.3f}s ({change:+.1f}%)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da extração do Anexo I com PDFs sintéticos")
+    parser.add_argument("--paginas", type=int, default=50, help="número de páginas do PDF sintético")
+    parser.add_argument("--linhas", type=int, default=40, help="linhas da tabela por página")
+    parser.add_argument("--workers", type=int, default=1, help="processos usados na extração")
+    parser.add_argument("--fast-path", action="store_true", help="reutiliza a geometria das colunas")
+    parser.add_argument("--saida", default=None, help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.paginas, args.linhas, args.workers, args.fast_path)
+
+    output_path = args.saida or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "benchmarks",
+        f"resultado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    for stage in results["etapas"]:
+        print(f"{stage['etapa']:>20}: {stage['segundos']:.3f}s | {stage['paginas_por_segundo']} páginas/s | "
+              f"{stage['linhas_por_segundo']} linhas/s | pico RSS {stage['pico_rss_mb']} MB")
+    print(f"Resultados salvos em: {output_path}")
+
+    if args.comparar:
+        compare(results, args.comparar)
@@ -1,34 +1,337 @@
 import pdfplumber
 import pandas as pd
 import zipfile
+import gzip
+import io
 import os
+import argparse
+import json
+import hashlib
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional, necessário apenas para as saídas Parquet/Arrow
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional, necessário apenas para a saída .csv.zst
+    zstandard = None
+
+class PageCache:
+    """
+    Cache em disco das linhas extraídas de cada página do PDF
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @classmethod
+    def page_key(cls, page, settings: str) -> str:
+        """Gera a chave da página a partir do seu content stream, dos seus recursos e das configurações da extração"""
+        digest = hashlib.sha256(settings.encode("utf-8"))
+        digest.update(repr((page.page_obj.attrs.get("MediaBox"), page.page_obj.attrs.get("Rotate"))).encode("utf-8"))
+        seen = set()
+        for stream in page.page_obj.contents:
+            cls._hash_object(digest, stream, seen)
+        # Fontes e XObjects mudam o texto extraído mesmo com o content stream igual
+        cls._hash_object(digest, page.page_obj.resources, seen)
+        return digest.hexdigest()
+    
+    @classmethod
+    def _hash_object(cls, digest, obj, seen: set):
+        """Atualiza o digest com um objeto do PDF, resolvendo as referências indiretas"""
+        if isinstance(obj, PDFObjRef):
+            if obj.objid in seen:  # Objeto compartilhado ou referência circular
+                digest.update(f"ref {obj.objid};".encode("utf-8"))
+                return
+            seen.add(obj.objid)
+            obj = resolve1(obj)
+        
+        if isinstance(obj, PDFStream):
+            cls._hash_object(digest, obj.attrs, seen)
+            raw = obj.get_rawdata()
+            digest.update(raw if raw is not None else obj.get_data())
+        elif isinstance(obj, dict):
+            for name in sorted(obj, key=str):
+                digest.update(f"{name}=".encode("utf-8"))
+                cls._hash_object(digest, obj[name], seen)
+        elif isinstance(obj, (list, tuple)):
+            digest.update(b"[")
+            for item in obj:
+                cls._hash_object(digest, item, seen)
+            digest.update(b"]")
+        else:
+            digest.update(f"{obj!r};".encode("utf-8"))
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key: str):
+        """Retorna as linhas da página em cache ou None"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+            os.utime(path)  # Marca como usado recentemente para a política de remoção
+            return rows
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, key: str, rows: list):
+        """Grava as linhas da página e remove as entradas mais antigas se o limite for excedido"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+    
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até o cache caber em max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Outro processo já removeu a entrada
+            total -= size
+
+def _merge_positions(values, tolerance: float) -> list:
+    """Ordena as coordenadas e funde as que estão a menos de tolerance pontos umas das outras"""
+    merged = []
+    for value in sorted(values):
+        if merged and value - merged[-1] <= tolerance:
+            continue
+        merged.append(value)
+    return merged
+
+def _extract_fixed_columns(page, column_bounds: list, tolerance: float = 2.0):
+    """
+    Extrai a tabela da página distribuindo as palavras em colunas já conhecidas
+    
+    Usa apenas as linhas horizontais da página para separar as linhas da tabela e evita a
+    detecção completa de bordas e interseções. Retorna None quando a página não confere com
+    a geometria aprendida, para que a detecção completa seja usada.
+    """
+    left, right = column_bounds[0], column_bounds[-1]
+    
+    # Linhas verticais fora das colunas aprendidas indicam um layout diferente
+    for edge in page.vertical_edges:
+        if left - tolerance <= edge["x0"] <= right + tolerance:
+            if abs(column_bounds[bisect_right(column_bounds, edge["x0"] + tolerance) - 1] - edge["x0"]) > tolerance:
+                return None
+    
+    row_bounds = _merge_positions(
+        [edge["top"] for edge in page.horizontal_edges
+         if edge["x0"] < right - tolerance and edge["x1"] > left + tolerance],
+        tolerance,
+    )
+    if len(row_bounds) < 2:
+        return None
+    top, bottom = row_bounds[0], row_bounds[-1]
+    
+    cells = {}
+    for word in page.extract_words():
+        y_center = (word["top"] + word["bottom"]) / 2
+        if not top <= y_center <= bottom:
+            continue  # Texto fora da tabela (cabeçalho e rodapé da página)
+        
+        column = bisect_right(column_bounds, word["x0"] + tolerance) - 1
+        if column < 0 or column >= len(column_bounds) - 1 or word["x1"] > column_bounds[column + 1] + tolerance:
+            return None  # Palavra atravessando colunas: geometria não confere
+        
+        row = bisect_right(row_bounds, y_center) - 1
+        cells.setdefault((row, column), []).append(word)
+    
+    table = []
+    for row in range(len(row_bounds) - 1):
+        values = []
+        for column in range(len(column_bounds) - 1):
+            lines = []
+            for word in sorted(cells.get((row, column), []), key=lambda w: (w["top"], w["x0"])):
+                if lines and abs(word["top"] - lines[-1][0]) <= 3:
+                    lines[-1][1].append(word["text"])
+                else:
+                    lines.append((word["top"], [word["text"]]))
+            values.append("\n".join(" ".join(words) for _, words in lines))
+        table.append(values)
+    return table
+
+def learn_column_bounds(pdf_path: str, pages: int = 3, table_settings: dict = None,
+                        tolerance: float = 2.0):
+    """
+    Aprende as bordas das colunas da tabela nas primeiras páginas do PDF
+    
+    Retorna None se as páginas não concordarem entre si ou se a extração rápida
+    não reproduzir exatamente o resultado da detecção completa nelas.
+    """
+    learned = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:pages]:
+            table = page.find_table(table_settings)
+            if table is None:
+                continue
+            bounds = _merge_positions([x for cell in table.cells for x in (cell[0], cell[2])], tolerance)
+            if learned and (len(bounds) != len(learned[0][0]) or
+                            any(abs(a - b) > tolerance for a, b in zip(bounds, learned[0][0]))):
+                return None
+            learned.append((bounds, table.extract(), page))
+        
+        if not learned:
+            return None
+        
+        column_bounds = learned[0][0]
+        for _, expected, page in learned:
+            if _extract_fixed_columns(page, column_bounds, tolerance) != expected:
+                return None
+    
+    return column_bounds
+
+def _iter_pages(pdf_path: str, start: int, end: int,
+                table_settings: dict = None, cache: PageCache = None,
+                column_bounds: list = None):
+    """Gera as linhas de cada página do intervalo [start, end), uma página por vez"""
+    settings = json.dumps([pdfplumber.__version__, table_settings, column_bounds], sort_keys=True)
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            key = cache.page_key(page, settings) if cache else None
+            tables = cache.get(key) if cache else None
+            hit = tables is not None
+            
+            if tables is None and column_bounds:
+                tables = _extract_fixed_columns(page, column_bounds)
+            
+            if tables is None:
+                tables = page.extract_table(table_settings) or []
+            
+            if cache and key and not hit:
+                cache.put(key, tables)
+            
+            yield tables
+            page.close()  # Libera os objetos já processados da página
+
+def _extract_pages(pdf_path: str, start: int, end: int,
+                   table_settings: dict = None, cache: PageCache = None,
+                   column_bounds: list = None) -> list:
+    """Extrai as linhas das páginas [start, end) abrindo o PDF no próprio processo"""
+    data = []
+    for rows in _iter_pages(pdf_path, start, end, table_settings, cache, column_bounds):
+        data.extend(rows)
+    return data
 
 class PDFExtractor:
     """
     Classe responsável por extrair dados da tabela do Anexo I
     """
-    def __init__(self, pdf_path: str):
+    COLUMNS = ["PROCEDIMENTO", "RN", "VIGÊNCIA", "OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT", "SUBGRUPO", "GRUPO", "CAPÍTULO" ]
+    
+    def __init__(self, pdf_path: str, workers: int = 1, chunk_size: int = 10,
+                 table_settings: dict = None, cache: PageCache = None,
+                 fast_path: bool = False, learn_pages: int = 3):
         self.pdf_path = pdf_path
+        self.workers = workers        # Processos usados na extração (1 = sequencial)
+        self.chunk_size = chunk_size  # Páginas por tarefa no modo paralelo
+        self.table_settings = table_settings
+        self.cache = cache            # Cache de páginas já extraídas (opcional)
+        self.fast_path = fast_path    # Reutiliza a geometria das colunas aprendida nas primeiras páginas
+        self.learn_pages = learn_pages
+        self.column_bounds = None
+        self.header = None            # Cabeçalho da tabela, como extraído da primeira página
+    
+    def _page_ranges(self) -> list:
+        """Divide as páginas do PDF em intervalos de chunk_size páginas"""
+        with pdfplumber.open(self.pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        return [(start, min(start + self.chunk_size, page_count))
+                for start in range(0, page_count, self.chunk_size)]
+    
+    def _iter_raw_batches(self):
+        """Gera as linhas por página (sequencial) ou por intervalo de páginas (paralelo)"""
+        if self.fast_path and self.column_bounds is None:
+            self.column_bounds = learn_column_bounds(self.pdf_path, self.learn_pages, self.table_settings)
+        
+        if self.workers <= 1:
+            yield from _iter_pages(self.pdf_path, 0, None, self.table_settings, self.cache,
+                                   self.column_bounds)
+            return
+        
+        ranges = self._page_ranges()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges) or 1)) as executor:
+            # Limita as tarefas em andamento para não acumular resultados na memória
+            pending = deque()
+            for start, end in ranges:
+                pending.append(executor.submit(_extract_pages, self.pdf_path, start, end,
+                                               self.table_settings, self.cache, self.column_bounds))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def iter_batches(self):
+        """Gera lotes de linhas na ordem das páginas, à medida que são extraídos"""
+        header_skipped = False
+        for rows in self._iter_raw_batches():
+            if rows and not header_skipped:
+                self.header = rows[0]
+                rows = rows[1:]  # Ignorando cabeçalho duplicado
+                header_skipped = True
+            if rows:
+                yield rows
+    
+    def iter_frames(self):
+        """Gera um DataFrame por lote de linhas extraído"""
+        for rows in self.iter_batches():
+            yield pd.DataFrame(rows, columns=self.COLUMNS)
     
     def extract_table(self) -> pd.DataFrame:
         """Extrai a tabela do PDF e retorna um DataFrame"""
-        data = []
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_table()
-                if tables:
-                    for row in tables:
-                        data.append(row)
-        
-        columns = ["PROCEDIMENTO", "RN", "VIGÊNCIA", "OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT", "SUBGRUPO", "GRUPO", "CAPÍTULO" ]
-        df = pd.DataFrame(data[1:], columns=columns)  # Ignorando cabeçalho duplicado
-        return df
+        data = [row for rows in self.iter_batches() for row in rows]
+        return pd.DataFrame(data, columns=self.COLUMNS)
 
 class DataProcessor:
     """
     Classe para processar e estruturar os dados extraídos
     """
+    # Regras declarativas por coluna: cada etapa só percorre as colunas que a declaram
+    #   whitespace: junta quebras de linha e espaços repetidos de células que quebram no PDF
+    #   map: substituição de valores exatos
+    #   category: conversão para dtype categórico
+    CLEANING_RULES = {
+        "PROCEDIMENTO": {"whitespace": True},
+        "RN": {"whitespace": True},
+        "VIGÊNCIA": {"whitespace": True},
+        "OD": {"whitespace": True, "map": {"OD": "Seg. Odontológica"}, "category": True},
+        "AMB": {"whitespace": True, "map": {"AMB": "Seg. Ambulatorial"}, "category": True},
+        "HCO": {"whitespace": True, "category": True},
+        "HSO": {"whitespace": True, "category": True},
+        "REF": {"whitespace": True, "category": True},
+        "PAC": {"whitespace": True, "category": True},
+        "DUT": {"whitespace": True, "category": True},
+        "SUBGRUPO": {"whitespace": True, "category": True},
+        "GRUPO": {"whitespace": True, "category": True},
+        "CAPÍTULO": {"whitespace": True, "category": True},
+    }
+    
+    def __init__(self, rules: dict = None):
+        self.rules = rules if rules is not None else self.CLEANING_RULES
+    
     @staticmethod
     def replace_abbreviations(df: pd.DataFrame) -> pd.DataFrame:
         """Substitui abreviações OD e AMB por descrições completas"""
@@ -38,27 +341,182 @@ class DataProcessor:
         }
         df.replace({"OD": mapping["OD"], "AMB": mapping["AMB"]}, inplace=True)
         return df
+    
+    def _columns_with(self, df: pd.DataFrame, rule: str) -> list:
+        return [column for column, rules in self.rules.items() if rules.get(rule) and column in df.columns]
+    
+    @staticmethod
+    def _normalize_text(values: pd.Series) -> pd.Series:
+        return values.astype("string").str.replace(r"\s+", " ", regex=True).str.strip()
+    
+    def drop_repeated_headers(self, df: pd.DataFrame, header: list = None) -> pd.DataFrame:
+        """
+        Remove as linhas que repetem o cabeçalho da tabela em cada página
+        
+        header é a primeira linha extraída do PDF (PDFExtractor.header); sem ela, os nomes
+        das colunas são usados. As células são comparadas com os espaços e quebras de linha
+        normalizados, já que no PDF os títulos quebram em várias linhas ("RN\n(alteração)").
+        """
+        header = list(df.columns) if header is None else header
+        expected = {column: " ".join(str(value).split()) for column, value in zip(df.columns, header)
+                    if value is not None and str(value).strip()}
+        if not expected:
+            return df
+        
+        normalized = set(self._columns_with(df, "whitespace"))
+        is_header = pd.Series(True, index=df.index)
+        for column, value in expected.items():
+            cells = df[column] if column in normalized else self._normalize_text(df[column])
+            is_header &= cells.eq(value).fillna(False).astype(bool)
+            if not is_header.any():
+                return df  # Nenhuma linha confere com o cabeçalho
+        return df[~is_header]
+    
+    def clean(self, df: pd.DataFrame, header: list = None) -> pd.DataFrame:
+        """Aplica as regras de limpeza por coluna e remove cabeçalhos repetidos"""
+        df = df.copy(deep=False)
+        
+        for column in self._columns_with(df, "whitespace"):
+            df[column] = self._normalize_text(df[column])
+        
+        df = self.drop_repeated_headers(df, header)
+        
+        for column in self._columns_with(df, "map"):
+            df[column] = df[column].replace(self.rules[column]["map"])
+        
+        for column in self._columns_with(df, "category"):
+            df[column] = df[column].astype("category")
+        
+        return df.reset_index(drop=True)
+
+class ColumnarEncoder:
+    """
+    Classe para converter lotes de DataFrame em RecordBatches do Arrow
+    
+    Os dicionários das colunas categóricas só crescem entre os lotes, o que permite
+    gravá-los como deltas no formato IPC e manter os mesmos códigos em todo o arquivo.
+    """
+    def __init__(self, columns: list, category_columns: list):
+        if pa is None:
+            raise ImportError("pyarrow é necessário para as saídas Parquet/Arrow: pip install pyarrow")
+        self.schema = pa.schema([
+            (column, pa.dictionary(pa.int32(), pa.string()) if column in category_columns else pa.string())
+            for column in columns
+        ])
+        self._dictionaries = {column: {} for column in columns if column in category_columns}
+    
+    def encode(self, df: pd.DataFrame):
+        """Converte um DataFrame em RecordBatch usando o schema do encoder"""
+        arrays = []
+        for field in self.schema:
+            values = df[field.name].astype(object)
+            mapping = self._dictionaries.get(field.name)
+            if mapping is None:
+                arrays.append(pa.array(values, pa.string(), from_pandas=True))
+                continue
+            
+            for value in pd.unique(values.dropna()):
+                mapping.setdefault(value, len(mapping))
+            codes = pd.Categorical(values, categories=list(mapping)).codes
+            indices = pa.array(codes, pa.int32(), mask=codes < 0)
+            arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(list(mapping), pa.string())))
+        return pa.record_batch(arrays, schema=self.schema)
 
 class CSVCompressor:
     """
     Classe para salvar o CSV e compactar no formato ZIP
     """
+    # Colunas com poucos valores distintos, gravadas com codificação de dicionário
+    CATEGORY_COLUMNS = ["OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT", "SUBGRUPO", "GRUPO", "CAPÍTULO"]
+    
     def __init__(self, output_dir: str, user_name: str):
         self.output_dir = output_dir
         self.user_name = user_name
     
-    def save_and_compress(self, df: pd.DataFrame):
+    def save_and_compress(self, df: pd.DataFrame, compression: str = "zip", level: int = 6):
         """Salva o DataFrame em CSV e compacta em um arquivo ZIP"""
-        csv_path = os.path.join(self.output_dir, "Rol_Procedimentos.csv")
-        zip_path = os.path.join(self.output_dir, f"Teste_{self.user_name}.zip")
+        return self.save_and_compress_stream([df], compression, level)
+    
+    def save_and_compress_stream(self, frames, compression: str = "zip", level: int = 6):
+        """
+        Codifica os DataFrames em CSV direto no arquivo compactado, sem CSV intermediário em disco
+        
+        compression: "zip" (entrada Rol_Procedimentos.csv no ZIP), "gzip" (.csv.gz) ou "zstd" (.csv.zst)
+        """
+        csv_name = "Rol_Procedimentos.csv"
+        
+        if compression == "zip":
+            output_path = os.path.join(self.output_dir, f"Teste_{self.user_name}.zip")
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as zipf:
+                with zipf.open(csv_name, 'w') as entry:
+                    self._write_csv(frames, entry)
+        
+        elif compression == "gzip":
+            output_path = os.path.join(self.output_dir, f"{csv_name}.gz")
+            with gzip.open(output_path, 'wb', compresslevel=level) as f:
+                self._write_csv(frames, f)
+        
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstandard é necessário para a saída .csv.zst: pip install zstandard")
+            output_path = os.path.join(self.output_dir, f"{csv_name}.zst")
+            with open(output_path, 'wb') as raw:
+                with zstandard.ZstdCompressor(level=level).stream_writer(raw) as f:
+                    self._write_csv(frames, f)
         
-        df.to_csv(csv_path, index=False, encoding='utf-8')
+        else:
+            raise ValueError(f"Compressão não suportada: {compression}")
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(csv_path, os.path.basename(csv_path))
+        return output_path
+    
+    @staticmethod
+    def _write_csv(frames, binary_stream):
+        """Escreve os DataFrames como CSV UTF-8 em um fluxo binário, lote a lote"""
+        text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8', newline='', write_through=True)
+        try:
+            header = True
+            for df in frames:
+                df.to_csv(text_stream, index=False, header=header)
+                header = False
+            text_stream.flush()
+        finally:
+            text_stream.detach()  # Mantém o fluxo binário aberto para quem o criou
+    
+    def save_parquet(self, frames, row_group_size: int = 64 * 1024, compression: str = "zstd"):
+        """Grava os dados em Parquet com categorias em dicionário, estatísticas e row groups"""
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        parquet_path = os.path.join(self.output_dir, "Rol_Procedimentos.parquet")
+        encoder = ColumnarEncoder(PDFExtractor.COLUMNS, self.CATEGORY_COLUMNS)
+        
+        with pq.ParquetWriter(parquet_path, encoder.schema, compression=compression,
+                              use_dictionary=self.CATEGORY_COLUMNS, write_statistics=True) as writer:
+            # Agrupa os lotes das páginas até completar um row group
+            pending, pending_rows = [], 0
+            for df in frames:
+                pending.append(encoder.encode(df))
+                pending_rows += len(df)
+                if pending_rows >= row_group_size:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_size)
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_size)
+        
+        return parquet_path
+    
+    def save_arrow(self, frames):
+        """Grava os dados em Arrow IPC sem compressão, pronto para leitura via memory-map"""
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        arrow_path = os.path.join(self.output_dir, "Rol_Procedimentos.arrow")
+        encoder = ColumnarEncoder(PDFExtractor.COLUMNS, self.CATEGORY_COLUMNS)
+        options = pa_ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        
+        with pa_ipc.new_file(arrow_path, encoder.schema, options=options) as writer:
+            for df in frames:
+                writer.write_batch(encoder.encode(df))
         
-        os.remove(csv_path)  # Remove CSV após compactação
-        return zip_path
+        return arrow_path
 
 if __name__ == "__main__":
     pdf_path = "2.TransformacaoDeDados/Anexo_I.pdf"  # Caminho do PDF
@@ -66,15 +524,28 @@ if __name__ == "__main__":
     user_name = "{Filipe_Santana}"      
     os.makedirs(output_dir, exist_ok=True)
     
+    parser = argparse.ArgumentParser(description="Extrai a tabela do Anexo I e salva os dados")
+    parser.add_argument("--formato", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="formato de saída (csv compactado em ZIP, Parquet ou Arrow IPC)")
+    parser.add_argument("--compressao", choices=["zip", "gzip", "zstd"], default="zip",
+                        help="compactação da saída csv")
+    parser.add_argument("--nivel", type=int, default=6,
+                        help="nível de compressão da saída csv")
+    args = parser.parse_args()
+    
     print("Aguarde...")
 
-    extractor = PDFExtractor(pdf_path)
-    df = extractor.extract_table()
-    
+    cache = PageCache(os.path.join(output_dir, ".cache_paginas"))
+    extractor = PDFExtractor(pdf_path, workers=os.cpu_count() or 1, cache=cache, fast_path=True)
     processor = DataProcessor()
-    df = processor.replace_abbreviations(df)
-    
     compressor = CSVCompressor(output_dir, user_name)
-    zip_file = compressor.save_and_compress(df)
     
-    print(f"Arquivo compactado salvo em: {zip_file}")
+    # Cada lote de páginas passa pelo processamento e é gravado assim que é extraído
+    frames = (processor.clean(df, extractor.header) for df in extractor.iter_frames())
+    if args.formato == "parquet":
+        print(f"Arquivo Parquet salvo em: {compressor.save_parquet(frames)}")
+    elif args.formato == "arrow":
+        print(f"Arquivo Arrow salvo em: {compressor.save_arrow(frames)}")
+    else:
+        zip_file = compressor.save_and_compress_stream(frames, args.compressao, args.nivel)
+        print(f"Arquivo compactado salvo em: {zip_file}")
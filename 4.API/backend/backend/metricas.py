@@ -0,0 +1,223 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+# Limites superiores dos buckets de cada histograma
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Métodos HTTP com série própria; os demais entram como "outro", para limitar a cardinalidade dos rótulos
+METODOS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# Medição da requisição em andamento; None fora de uma requisição medida
+_medicao_atual = contextvars.ContextVar("medicao_atual", default=None)
+
+
+class Medicao:
+    """Tempos acumulados durante uma requisição"""
+    __slots__ = ("inicio", "consultas", "tempo_banco", "tempo_render")
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.tempo_render = 0.0
+
+
+class Histograma:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.contagens = [0] * (len(buckets) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.buckets, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome, rotulos):
+        acumulado = 0
+        for limite, contagem in zip(self.buckets + ("+Inf",), self.contagens):
+            acumulado += contagem
+            yield f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}'
+        yield f"{nome}_sum{{{rotulos}}} {self.soma}"
+        yield f"{nome}_count{{{rotulos}}} {self.total}"
+
+
+class RegistroMetricas:
+    """
+    Métricas por view, acumuladas no processo
+
+    Cada worker tem o próprio registro; o Prometheus soma as séries de todos eles.
+    """
+    HISTOGRAMAS = {
+        "http_duracao_segundos": ("Duração das requisições", BUCKETS_SEGUNDOS),
+        "http_consultas_banco": ("Consultas ao banco por requisição", BUCKETS_CONSULTAS),
+        "http_tempo_banco_segundos": ("Tempo em consultas ao banco por requisição", BUCKETS_SEGUNDOS),
+        "http_tempo_render_segundos": ("Tempo de serialização da resposta", BUCKETS_SEGUNDOS),
+        "http_resposta_bytes": ("Tamanho do corpo das respostas", BUCKETS_BYTES),
+    }
+
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.requisicoes = {}
+        self.histogramas = {nome: {} for nome in self.HISTOGRAMAS}
+        self.coletores = []
+
+    def registrar(self, view, metodo, status, medicao, duracao, tamanho):
+        valores = {
+            "http_duracao_segundos": duracao,
+            "http_consultas_banco": medicao.consultas,
+            "http_tempo_banco_segundos": medicao.tempo_banco,
+            "http_tempo_render_segundos": medicao.tempo_render,
+            "http_resposta_bytes": tamanho,
+        }
+        with self.trava:
+            chave = (view, metodo, status)
+            self.requisicoes[chave] = self.requisicoes.get(chave, 0) + 1
+            for nome, valor in valores.items():
+                if valor is None:
+                    continue
+                por_view = self.histogramas[nome]
+                if view not in por_view:
+                    por_view[view] = Histograma(self.HISTOGRAMAS[nome][1])
+                por_view[view].observar(valor)
+
+    def registrar_coletor(self, coletor):
+        # coletor() devolve [(nome, tipo, ajuda, [(rotulos, valor), ...]), ...], lido a cada /metrics
+        self.coletores.append(coletor)
+
+    def exportar(self):
+        # Formato de texto do Prometheus (text/plain; version=0.0.4)
+        linhas = ["# HELP http_requisicoes_total Requisições atendidas", "# TYPE http_requisicoes_total counter"]
+        with self.trava:
+            for (view, metodo, status), total in sorted(self.requisicoes.items()):
+                linhas.append(f'http_requisicoes_total{{view="{view}",metodo="{metodo}",status="{status}"}} {total}')
+            for nome, (ajuda, _) in self.HISTOGRAMAS.items():
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"]
+                for view, histograma in sorted(self.histogramas[nome].items()):
+                    linhas += histograma.linhas(nome, f'view="{view}"')
+
+        for coletor in self.coletores:
+            for nome, tipo, ajuda, amostras in coletor():
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+                for rotulos, valor in amostras:
+                    rotulos = ",".join(f'{chave}="{texto}"' for chave, texto in rotulos.items())
+                    linhas.append(f"{nome}{{{rotulos}}} {valor}" if rotulos else f"{nome} {valor}")
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+
+def metricas_habilitadas():
+    return getattr(settings, "METRICAS_HABILITADAS", False)
+
+
+def medir_render(inicio):
+    # Chamado pelos renderers para separar o tempo de serialização
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.tempo_render += time.perf_counter() - inicio
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.consultas += 1
+        medicao.tempo_banco += time.perf_counter() - inicio
+
+
+def _instrumentar_conexao(sender, connection, **kwargs):
+    # Fica em todas as conexões, inclusive nas threads usadas pelo ORM async; fora de uma
+    # requisição medida custa apenas a leitura do contextvar
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+def _instrumentar_conexoes_abertas():
+    # O sinal connection_created só alcança conexões abertas depois que o middleware foi carregado;
+    # as já abertas nesta thread (ou contexto async) são instrumentadas aqui
+    for conexao in connections.all(initialized_only=True):
+        _instrumentar_conexao(None, conexao)
+
+
+class MetricasMiddleware:
+    """
+    Mede cada requisição: duração, consultas ao banco, serialização e tamanho da resposta
+
+    Os tempos vão para o cabeçalho Server-Timing e para os histogramas expostos em
+    /metrics. Com METRICAS_HABILITADAS = False o Django retira o middleware da cadeia.
+    Deve ser o primeiro de MIDDLEWARE, para que a duração inclua os demais.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metricas_habilitadas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(_instrumentar_conexao, dispatch_uid="metricas_instrumentar_conexao")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        _instrumentar_conexoes_abertas()
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self._finalizar(request, response, medicao)
+
+    async def __acall__(self, request):
+        _instrumentar_conexoes_abertas()
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self._finalizar(request, response, medicao)
+
+    def _finalizar(self, request, response, medicao):
+        duracao = time.perf_counter() - medicao.inicio
+        tamanho = None if response.streaming else len(response.content)
+        resolver_match = getattr(request, "resolver_match", None)
+        view = (resolver_match.view_name if resolver_match else None) or "nao_resolvida"
+        metodo = request.method if request.method in METODOS else "outro"
+        registro.registrar(view, metodo, response.status_code, medicao, duracao, tamanho)
+
+        # app: o que sobra fora do banco e da serialização (código da view e middlewares)
+        aplicacao = max(duracao - medicao.tempo_banco - medicao.tempo_render, 0.0)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={medicao.tempo_banco * 1000:.2f};desc="{medicao.consultas} consultas"',
+            f"render;dur={medicao.tempo_render * 1000:.2f}",
+            f"app;dur={aplicacao * 1000:.2f}",
+            f"total;dur={duracao * 1000:.2f}",
+        ])
+        return response
+
+
+def metricas(request):
+    if not metricas_habilitadas():
+        raise Http404
+    return HttpResponse(registro.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,82 @@
+import gzip
+import re
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # sem o pacote brotli, só gzip é negociado
+    brotli = None
+
+re_codificacao = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def codificacoes_aceitas(accept_encoding):
+    # {"br": 1.0, "gzip": 0.8, ...} a partir do Accept-Encoding; q=0 significa recusado
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        encontrado = re_codificacao.match(item)
+        if not encontrado or not encontrado.group(1):
+            continue
+        try:
+            qualidade = float(encontrado.group(2)) if encontrado.group(2) else 1.0
+        except ValueError:
+            continue
+        aceitas[encontrado.group(1).lower()] = qualidade
+    return aceitas
+
+
+class CompressaoMiddleware(MiddlewareMixin):
+    """
+    Compacta as respostas com brotli ou gzip, conforme o Accept-Encoding do cliente
+
+    Respostas menores que COMPRESSAO_TAMANHO_MINIMO bytes seguem sem compactação:
+    nelas o custo de CPU não compensa os bytes economizados. Entre as codificações
+    aceitas, vale a de maior q; no empate, brotli.
+
+    Só são compactados os tipos de COMPRESSAO_TIPOS (por padrão, o JSON da API).
+    Páginas HTML, como o admin e a API navegável, levam o token CSRF, e compactar um
+    segredo junto com texto vindo da requisição abre espaço para o ataque BREACH.
+    """
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        tipo = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if tipo not in getattr(settings, "COMPRESSAO_TIPOS", ("application/json",)):
+            return response
+        if len(response.content) < getattr(settings, "COMPRESSAO_TAMANHO_MINIMO", 1024):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codificacao = self._escolher(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if codificacao is None:
+            return response
+
+        if codificacao == "br":
+            conteudo = brotli.compress(response.content, quality=getattr(settings, "COMPRESSAO_NIVEL_BROTLI", 4))
+        else:
+            conteudo = gzip.compress(response.content, compresslevel=getattr(settings, "COMPRESSAO_NIVEL_GZIP", 6), mtime=0)
+        if len(conteudo) >= len(response.content):
+            return response
+
+        response.content = conteudo
+        response["Content-Length"] = str(len(conteudo))
+        response["Content-Encoding"] = codificacao
+        # Como no GZipMiddleware: o corpo mudou, então a ETag forte passa a ser fraca
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    @staticmethod
+    def _escolher(accept_encoding):
+        aceitas = codificacoes_aceitas(accept_encoding)
+        candidatas = [("br", 2)] if brotli is not None else []
+        candidatas.append(("gzip", 1))
+        melhor = None
+        for nome, preferencia in candidatas:
+            qualidade = aceitas.get(nome, aceitas.get("*", 0))
+            if qualidade > 0 and (melhor is None or (qualidade, preferencia) > melhor[0]):
+                melhor = ((qualidade, preferencia), nome)
+        return melhor[1] if melhor else None
@@ -0,0 +1,47 @@
+import time
+from rest_framework.renderers import JSONRenderer
+from .metricas import medir_render
+
+try:
+    import orjson
+except ImportError:  # sem orjson, o renderer se comporta como o JSONRenderer do DRF
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer do DRF serializado com orjson
+
+    Gera JSON compacto como o renderer padrão (UTF-8, sem escapes de acentos).
+    Datas, horários, subclasses de str/int/dict/list e tipos que o orjson não conhece
+    (Decimal, lazy strings, QuerySet...) passam pelo encoder do DRF, que grava datas
+    UTC com "Z". O que o orjson não consegue serializar, como inteiros maiores que
+    64 bits, volta para o renderer do DRF. A única diferença restante é a notação de
+    floats grandes (1e16 em vez de 1e+16), que continua sendo JSON válido. Saída
+    indentada, pedida pelo Accept ou pela API navegável, continua com o json da
+    biblioteca padrão.
+    """
+    OPCOES = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+              if orjson else 0)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        inicio = time.perf_counter()
+        try:
+            return self._render(data, accepted_media_type, renderer_context)
+        finally:
+            medir_render(inicio)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.OPCOES)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Mesmo cuidado do JSONRenderer: U+2028 e U+2029 escapados, para o JSON ser JavaScript válido
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
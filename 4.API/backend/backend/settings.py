@@ -43,7 +43,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'backend.middleware.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.common.CommonMiddleware',
@@ -55,6 +57,41 @@ MIDDLEWARE = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Métricas por requisição: Server-Timing e /metrics (backend/metricas.py)
+METRICAS_HABILITADAS = False
+
+# Compactação das respostas (backend/middleware.py)
+COMPRESSAO_TAMANHO_MINIMO = 1024  # bytes
+COMPRESSAO_NIVEL_GZIP = 6
+COMPRESSAO_NIVEL_BROTLI = 4
+COMPRESSAO_TIPOS = ("application/json",)  # HTML com token CSRF fica de fora (BREACH)
+
+# Paginação de /api/busca/ (operadoras/paginacao.py)
+OPERADORAS_BUSCA_LIMITE_PADRAO = 20
+OPERADORAS_BUSCA_LIMITE_MAXIMO = 100
+
+# Índice de busca em memória para o autocomplete (operadoras/indice.py)
+OPERADORAS_INDICE_MEMORIA = False
+
+# Versão dos dados: intervalo, em segundos, entre as leituras no banco (operadoras/versao.py)
+OPERADORAS_VERSAO_INTERVALO = 2
+
+# Cache das respostas da busca (operadoras/cache.py)
+OPERADORAS_CACHE_HABILITADO = True
+OPERADORAS_CACHE_MAX_ITENS = 1024
+OPERADORAS_CACHE_TTL = 300  # segundos
+OPERADORAS_CACHE_BACKEND = None  # alias em CACHES para o nível compartilhado, ex.: "default"
+
+# Cache HTTP das respostas das operadoras (Cache-Control: public, max-age)
+OPERADORAS_HTTP_MAX_AGE = 60  # segundos
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -16,8 +16,10 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include  
+from .metricas import metricas
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('operadoras.urls')),  
+    path('metrics', metricas, name='metricas'),
 ]
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _garantir_indice_busca(sender, using, **kwargs):
+    from .busca import garantir_triggers_fts
+
+    garantir_triggers_fts(using)
 
 
 class OperadorasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'operadoras'
+
+    def ready(self):
+        post_migrate.connect(_garantir_indice_busca, sender=self)
+
+        from backend.metricas import registro
+        from .cache import coletar_metricas_cache
+
+        registro.registrar_coletor(coletar_metricas_cache)
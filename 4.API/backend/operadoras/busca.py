@@ -0,0 +1,97 @@
+from django.db import connection, connections
+from django.db.models import Case, ExpressionWrapper, FloatField, Value, When
+from django.db.models.functions import Cast, Length
+from django.db.models.expressions import RawSQL
+from .models import Operadora
+from .normalizacao import normalizar
+
+# Tabela FTS5 usada como índice de busca no SQLite (criada na migração 0008)
+TABELA_FTS = "operadoras_operadora_fts"
+
+# O tokenizador trigram do FTS5 só encontra termos com pelo menos 3 caracteres
+TAMANHO_MINIMO_FTS = 3
+
+# Triggers que mantêm a tabela FTS5 em sincronia com operadoras_operadora
+TRIGGERS_FTS = {
+    f"{TABELA_FTS}_ai": (
+        f'AFTER INSERT ON "operadoras_operadora" BEGIN '
+        f"INSERT INTO {TABELA_FTS}(rowid, Razao_Social_Busca) VALUES (new.id, new.Razao_Social_Busca); END"
+    ),
+    f"{TABELA_FTS}_ad": (
+        f'AFTER DELETE ON "operadoras_operadora" BEGIN '
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, Razao_Social_Busca) "
+        f"VALUES ('delete', old.id, old.Razao_Social_Busca); END"
+    ),
+    f"{TABELA_FTS}_au": (
+        f'AFTER UPDATE ON "operadoras_operadora" BEGIN '
+        f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, Razao_Social_Busca) "
+        f"VALUES ('delete', old.id, old.Razao_Social_Busca); "
+        f"INSERT INTO {TABELA_FTS}(rowid, Razao_Social_Busca) VALUES (new.id, new.Razao_Social_Busca); END"
+    ),
+}
+
+def garantir_triggers_fts(using="default"):
+    # Migrações que recriam a tabela no SQLite (AddField, AlterField) descartam os triggers;
+    # aqui eles são recriados e o índice FTS5 é reconstruído a partir da tabela
+    conexao = connections[using]
+    if conexao.vendor != "sqlite":
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existentes = {linha[0] for linha in cursor.fetchall()}
+        faltando = [nome for nome in TRIGGERS_FTS if nome not in existentes]
+        if TABELA_FTS not in existentes or not faltando:
+            return
+        for nome in faltando:
+            cursor.execute(f"CREATE TRIGGER {nome} {TRIGGERS_FTS[nome]}")
+        cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+
+def _buscar_postgresql(termo, queryset):
+    # LIKE sobre a coluna normalizada usa o índice GIN pg_trgm; a similaridade ordena os resultados
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    # A similaridade é real; convertida para double precision, o valor guardado no cursor volta
+    # ao banco exatamente igual e os empates com a última linha da página não se perdem
+    return queryset.filter(Razao_Social_Busca__contains=termo).annotate(
+        relevancia=Cast(TrigramSimilarity("Razao_Social_Busca", termo), FloatField())
+    )
+
+def _buscar_sqlite(termo, queryset):
+    # Termos curtos não geram trigramas; nesse caso a tabela é pequena o bastante para o LIKE
+    if len(termo) < TAMANHO_MINIMO_FTS:
+        return _buscar_like(termo, queryset)
+
+    frase = '"' + termo.replace('"', '""') + '"'
+    # O FTS5 resolve o filtro pelo índice; a relevância é calculada sobre as linhas encontradas
+    # (consultar o rank por linha faria um MATCH para cada resultado)
+    return queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s", [frase])
+    ).annotate(relevancia=_relevancia_substring(termo))
+
+def _relevancia_substring(termo):
+    # Nomes que começam pelo termo vêm primeiro; depois, quanto maior a parte do nome coberta pelo termo, melhor
+    return ExpressionWrapper(
+        Case(When(Razao_Social_Busca__startswith=termo, then=Value(1.0)), default=Value(0.0))
+        + Value(float(len(termo))) / Length("Razao_Social_Busca"),
+        output_field=FloatField(),
+    )
+
+def _buscar_like(termo, queryset):
+    return queryset.filter(Razao_Social_Busca__contains=termo).annotate(relevancia=_relevancia_substring(termo))
+
+def buscar(termo, queryset=None):
+    # Busca por substring na razão social, sem diferenciar acentos nem maiúsculas.
+    # O queryset vem anotado com `relevancia` e ordenado por (-relevancia, id), a chave da paginação por cursor
+    queryset = Operadora.objects.filter(Ativa=True) if queryset is None else queryset
+    termo = normalizar(termo)
+    if not termo:
+        # Sem termo não há resultado, mas o queryset mantém o formato esperado pela paginação
+        return queryset.none().annotate(relevancia=Value(0.0, output_field=FloatField())).order_by("-relevancia", "id")
+
+    if connection.vendor == "postgresql":
+        resultado = _buscar_postgresql(termo, queryset)
+    elif connection.vendor == "sqlite":
+        resultado = _buscar_sqlite(termo, queryset)
+    else:
+        resultado = _buscar_like(termo, queryset)
+    return resultado.order_by("-relevancia", "id")
@@ -0,0 +1,252 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from .versao import aversao_atual, versao_atual
+
+class CacheRespostas:
+    """
+    Cache das respostas já renderizadas da busca, em dois níveis
+
+    O primeiro nível é um LRU por processo, limitado em itens e com TTL. O segundo,
+    opcional, é um backend do framework de cache do Django (OPERADORAS_CACHE_BACKEND),
+    compartilhado entre os workers. A versão dos dados faz parte da chave, então uma
+    importação invalida todas as entradas sem precisar apagá-las.
+    """
+    def __init__(self, max_itens=1024, ttl=300, backend=None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.backend = backend
+        self.itens = OrderedDict()
+        self.trava = threading.Lock()
+        self.contadores = {"acertos_local": 0, "acertos_compartilhado": 0, "faltas": 0}
+
+    def _contar(self, nome):
+        with self.trava:
+            self.contadores[nome] += 1
+
+    def _compartilhado(self):
+        return caches[self.backend] if self.backend else None
+
+    def _obter_local(self, chave):
+        agora = time.monotonic()
+        with self.trava:
+            item = self.itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > agora:
+                    self.itens.move_to_end(chave)
+                    self.contadores["acertos_local"] += 1
+                    return valor
+                del self.itens[chave]
+        return None
+
+    def _registrar_compartilhado(self, chave, valor):
+        if valor is None:
+            self._contar("faltas")
+            return None
+        self._guardar_local(chave, valor)
+        self._contar("acertos_compartilhado")
+        return valor
+
+    def obter(self, chave):
+        valor = self._obter_local(chave)
+        if valor is not None:
+            return valor
+
+        compartilhado = self._compartilhado()
+        return self._registrar_compartilhado(chave, compartilhado.get(chave) if compartilhado else None)
+
+    async def aobter(self, chave):
+        valor = self._obter_local(chave)
+        if valor is not None:
+            return valor
+
+        compartilhado = self._compartilhado()
+        return self._registrar_compartilhado(chave, await compartilhado.aget(chave) if compartilhado else None)
+
+    def _guardar_local(self, chave, valor):
+        with self.trava:
+            self.itens[chave] = (time.monotonic() + self.ttl, valor)
+            self.itens.move_to_end(chave)
+            while len(self.itens) > self.max_itens:
+                self.itens.popitem(last=False)
+
+    def guardar(self, chave, valor):
+        self._guardar_local(chave, valor)
+        compartilhado = self._compartilhado()
+        if compartilhado is not None:
+            compartilhado.set(chave, valor, timeout=self.ttl)
+
+    async def aguardar(self, chave, valor):
+        self._guardar_local(chave, valor)
+        compartilhado = self._compartilhado()
+        if compartilhado is not None:
+            await compartilhado.aset(chave, valor, timeout=self.ttl)
+
+    def limpar(self):
+        with self.trava:
+            self.itens.clear()
+
+    def estatisticas(self):
+        with self.trava:
+            dados = dict(self.contadores, itens=len(self.itens))
+        consultas = dados["acertos_local"] + dados["acertos_compartilhado"] + dados["faltas"]
+        dados["taxa_acerto"] = round((consultas - dados["faltas"]) / consultas, 4) if consultas else None
+        return dados
+
+_cache = None
+_trava = threading.Lock()
+
+def obter_cache():
+    global _cache
+    if _cache is None:
+        with _trava:
+            if _cache is None:
+                _cache = CacheRespostas(
+                    max_itens=getattr(settings, "OPERADORAS_CACHE_MAX_ITENS", 1024),
+                    ttl=getattr(settings, "OPERADORAS_CACHE_TTL", 300),
+                    backend=getattr(settings, "OPERADORAS_CACHE_BACKEND", None),
+                )
+    return _cache
+
+def coletar_metricas_cache():
+    # Contadores do cache de respostas no formato do registro de métricas (backend/metricas.py)
+    if _cache is None:
+        return []
+    dados = _cache.estatisticas()
+    return [
+        ("operadoras_cache_consultas_total", "counter", "Consultas ao cache de respostas", [
+            ({"resultado": nome}, dados[nome]) for nome in ("acertos_local", "acertos_compartilhado", "faltas")
+        ]),
+        ("operadoras_cache_itens", "gauge", "Itens no nível local do cache de respostas", [({}, dados["itens"])]),
+    ]
+
+def resumo_requisicao(request):
+    # Caminho e parâmetros ordenados, para que "?q=a&limite=5" e "?limite=5&q=a" tenham o mesmo resumo;
+    # o Accept entra porque o DRF escolhe o renderer por ele
+    parametros = "&".join(f"{nome}={valor}" for nome, valores in sorted(request.GET.lists()) for valor in valores)
+    texto = f"{request.path}?{parametros}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+def chave_requisicao(prefixo, request, versao):
+    return f"operadoras:{prefixo}:v{versao}:{resumo_requisicao(request)}"
+
+def _resposta_guardada(guardado):
+    # Os cabeçalhos guardados (Content-Type, Allow, Vary...) fazem um acerto ser igual à resposta original
+    conteudo, cabecalhos = guardado
+    resposta = HttpResponse(conteudo)
+    for nome, valor in cabecalhos:
+        resposta[nome] = valor
+    resposta["X-Cache"] = "HIT"
+    return resposta
+
+def _conteudo_para_guardar(resposta):
+    if resposta.status_code != 200:
+        return None
+    if hasattr(resposta, "render") and not resposta.is_rendered:
+        resposta.render()
+    return resposta.content, tuple(resposta.items())
+
+def _usa_cache(request):
+    return getattr(settings, "OPERADORAS_CACHE_HABILITADO", True) and request.method == "GET"
+
+def cache_resposta(prefixo):
+    # Decorador para views GET (síncronas ou async): guarda o corpo renderizado das respostas 200
+    # e o devolve nas repetições
+    def decorador(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_async(request, *args, **kwargs):
+                if not _usa_cache(request):
+                    return await view(request, *args, **kwargs)
+
+                cache = obter_cache()
+                versao, _ = await aversao_atual()
+                chave = chave_requisicao(prefixo, request, versao)
+                guardado = await cache.aobter(chave)
+                if guardado is not None:
+                    return _resposta_guardada(guardado)
+
+                resposta = await view(request, *args, **kwargs)
+                conteudo = _conteudo_para_guardar(resposta)
+                if conteudo is not None:
+                    await cache.aguardar(chave, conteudo)
+                resposta["X-Cache"] = "MISS"
+                return resposta
+            return wrapper_async
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _usa_cache(request):
+                return view(request, *args, **kwargs)
+
+            cache = obter_cache()
+            versao, _ = versao_atual()
+            chave = chave_requisicao(prefixo, request, versao)
+            guardado = cache.obter(chave)
+            if guardado is not None:
+                return _resposta_guardada(guardado)
+
+            resposta = view(request, *args, **kwargs)
+            conteudo = _conteudo_para_guardar(resposta)
+            if conteudo is not None:
+                cache.guardar(chave, conteudo)
+            resposta["X-Cache"] = "MISS"
+            return resposta
+        return wrapper
+    return decorador
+
+def _versao_da_requisicao(request):
+    # Views async leem a versão antes do condition (que chama as funções de ETag de forma síncrona)
+    return getattr(request, "_versao_dados", None) or versao_atual()
+
+def etag_dados(prefixo):
+    # ETag forte: muda quando a versão dos dados, o caminho, os parâmetros ou o Accept mudam
+    def etag(request, *args, **kwargs):
+        versao, _ = _versao_da_requisicao(request)
+        return f"{prefixo}-v{versao}-{resumo_requisicao(request)[:20]}"
+    return etag
+
+def ultima_modificacao_dados(request, *args, **kwargs):
+    _, atualizado_em = _versao_da_requisicao(request)
+    return atualizado_em
+
+def _cache_http_so_em_sucesso(resposta):
+    # ETag, Last-Modified e max-age valem para as respostas 200 e os 304 derivados delas; erros de
+    # validação (400) ou operadora inexistente (404) não devem ser guardados por navegador e proxies
+    if resposta.status_code not in (200, 304):
+        for cabecalho in ("ETag", "Last-Modified", "Cache-Control"):
+            del resposta[cabecalho]
+        add_never_cache_headers(resposta)
+    return resposta
+
+def resposta_condicional(prefixo):
+    # ETag/Last-Modified calculados antes da view: um If-None-Match válido recebe 304 sem consultar
+    # as operadoras. O Cache-Control permite que navegador e proxies reutilizem a resposta
+    def decorador(view):
+        assincrona = iscoroutinefunction(view)
+        view = condition(etag_func=etag_dados(prefixo), last_modified_func=ultima_modificacao_dados)(view)
+        view = vary_on_headers("Accept")(view)
+        view = cache_control(public=True, max_age=getattr(settings, "OPERADORAS_HTTP_MAX_AGE", 60))(view)
+        if not assincrona:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                return _cache_http_so_em_sucesso(view(request, *args, **kwargs))
+            return wrapper
+
+        @wraps(view)
+        async def wrapper_async(request, *args, **kwargs):
+            request._versao_dados = await aversao_atual()
+            return _cache_http_so_em_sucesso(await view(request, *args, **kwargs))
+        return wrapper_async
+    return decorador
@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from .models import Operadora
+from .normalizacao import normalizar
+from .versao import aversao_atual, versao_atual
+
+# Campos devolvidos pela busca (os mesmos da resposta de /api/busca/)
+CAMPOS_RESULTADO = ["id", "Registro_ANS", "CNPJ", "Razao_Social", "Modalidade", "Cidade", "UF"]
+
+# Campos indexados e o peso de cada um no ranking
+CAMPOS_INDEXADOS = {"Razao_Social": 4, "Nome_Fantasia": 3, "CNPJ": 2, "Registro_ANS": 2}
+
+# Campos numéricos: pontuação e espaços são ignorados ("19.541.931/0001-25" -> "19541931000125")
+CAMPOS_NUMERICOS = {"CNPJ", "Registro_ANS"}
+
+TAMANHO_NGRAMA = 3
+
+def _normalizar_campo(campo, valor):
+    if campo in CAMPOS_NUMERICOS:
+        return re.sub(r"\D", "", valor or "")
+    return normalizar(valor)
+
+def _ngramas(texto):
+    return {texto[i:i + TAMANHO_NGRAMA] for i in range(len(texto) - TAMANHO_NGRAMA + 1)}
+
+class IndiceBusca:
+    """
+    Índice em memória das operadoras ativas para o autocomplete
+
+    Termos com 3 ou mais caracteres são resolvidos pela interseção das listas de
+    trigramas; termos menores, pelo índice de prefixos das palavras.
+    """
+    def __init__(self, documentos, versao=None):
+        self.versao = versao
+        self.documentos = {}
+        self.textos = {}
+        self.ngramas = defaultdict(set)
+        self.prefixos = defaultdict(set)
+        # O índice não muda depois de montado, então as respostas podem ser memorizadas
+        self.buscar = lru_cache(maxsize=1024)(self._buscar)
+
+        for documento in documentos:
+            id_ = documento["id"]
+            self.documentos[id_] = {campo: documento[campo] for campo in CAMPOS_RESULTADO}
+            textos = {campo: _normalizar_campo(campo, documento.get(campo, "")) for campo in CAMPOS_INDEXADOS}
+            self.textos[id_] = textos
+            for texto in textos.values():
+                for ngrama in _ngramas(texto):
+                    self.ngramas[ngrama].add(id_)
+                for palavra in texto.split():
+                    for tamanho in range(1, TAMANHO_NGRAMA):
+                        self.prefixos[palavra[:tamanho]].add(id_)
+
+    @classmethod
+    def do_banco(cls):
+        campos = sorted(set(CAMPOS_RESULTADO) | set(CAMPOS_INDEXADOS))
+        versao, _ = versao_atual()
+        return cls(Operadora.objects.filter(Ativa=True).values(*campos), versao)
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def _candidatos(self, termo):
+        if len(termo) < TAMANHO_NGRAMA:
+            return self.prefixos.get(termo, set())
+
+        listas = sorted((self.ngramas.get(ngrama, set()) for ngrama in _ngramas(termo)), key=len)
+        if not listas[0]:
+            return set()
+        return set.intersection(*listas)
+
+    @staticmethod
+    def _pontuar(texto, termo, peso):
+        # Igualdade > início do campo > início de palavra > substring
+        posicao = texto.find(termo)
+        if posicao < 0:
+            return 0
+        if texto == termo:
+            return peso * 4
+        if posicao == 0:
+            return peso * 3
+        if texto[posicao - 1] == " ":
+            return peso * 2
+        return peso
+
+    def _buscar(self, consulta, limite=20):
+        # Devolve os `limite` documentos mais relevantes (todos, com limite=None), sem acessar o banco
+        termo = normalizar(consulta)
+        numerico = re.sub(r"\D", "", termo)
+        if not termo:
+            return []
+
+        pontuados = []
+        for id_ in self._candidatos(termo) | (self._candidatos(numerico) if numerico and numerico != termo else set()):
+            textos = self.textos[id_]
+            pontos = 0
+            for campo, peso in CAMPOS_INDEXADOS.items():
+                alvo = numerico if campo in CAMPOS_NUMERICOS else termo
+                if alvo:
+                    pontos = max(pontos, self._pontuar(textos[campo], alvo, peso))
+            if pontos:
+                pontuados.append((-pontos, len(textos["Razao_Social"]), textos["Razao_Social"], id_))
+
+        ordenados = sorted(pontuados) if limite is None else heapq.nsmallest(limite, pontuados)
+        return [self.documentos[item[-1]] for item in ordenados]
+
+_indice = None
+_trava = threading.RLock()
+
+def indice_habilitado():
+    return getattr(settings, "OPERADORAS_INDICE_MEMORIA", False)
+
+def reconstruir_indice():
+    # Monta um novo índice e troca a referência; buscas em andamento seguem com o anterior
+    global _indice
+    with _trava:
+        _indice = IndiceBusca.do_banco()
+        return _indice
+
+def obter_indice():
+    # O índice é reconstruído quando a versão dos dados muda, inclusive por importações de outros processos
+    indice = _indice
+    if indice is None or indice.versao != versao_atual()[0]:
+        with _trava:
+            if _indice is indice:
+                reconstruir_indice()
+            indice = _indice
+    return indice
+
+async def aobter_indice():
+    # Para views async: com o índice em dia não há consulta; a reconstrução roda em uma thread
+    indice = _indice
+    if indice is None or indice.versao != (await aversao_atual())[0]:
+        indice = await sync_to_async(obter_indice)()
+    return indice
+
+def _carregar_indice():
+    try:
+        obter_indice()
+    except DatabaseError as e:
+        print(f"Índice de busca não carregado: {e}")
+    finally:
+        connections.close_all()
+
+def preparar_indice():
+    # Chamado na inicialização do servidor para que a primeira busca não pague a montagem do índice.
+    # O uvicorn importa a aplicação dentro do event loop, onde o ORM síncrono não pode ser usado
+    if not indice_habilitado():
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        _carregar_indice()
+        return
+    carga = threading.Thread(target=_carregar_indice)
+    carga.start()
+    carga.join()
@@ -0,0 +1,98 @@
+import gzip
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from backend.middleware import brotli
+from backend.renderers import ORJSONRenderer
+from operadoras.busca import buscar
+from operadoras.paginacao import CAMPOS_PERMITIDOS, Paginacao
+
+
+def medir(funcao, repeticoes):
+    # Mediana do tempo de execução, em microssegundos
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tempos) * 1e6, 1)
+
+
+class Command(BaseCommand):
+    help = "Mede serialização e bytes trafegados por /api/busca/: JSONRenderer x orjson, sem compactação x gzip/brotli"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consultas", nargs="+", default=["a", "uni", "amil", "saude"], help="termos buscados")
+        parser.add_argument("--repeticoes", type=int, default=200, help="execuções por medição")
+        parser.add_argument("--saida", default=None, help="arquivo JSON com os resultados")
+
+    def _serializacao(self, consulta, repeticoes):
+        # Página máxima com todos os campos: o pior caso de serialização da busca
+        paginacao = Paginacao({"limite": "100", "fields": ",".join(CAMPOS_PERMITIDOS)})
+        dados = paginacao.paginar_queryset(buscar(consulta))
+        padrao, rapido = JSONRenderer(), ORJSONRenderer()
+        corpo = rapido.render(dados)
+        if corpo != padrao.render(dados):
+            self.stderr.write(f"Aviso: saídas diferentes entre os renderers para {consulta!r}")
+
+        resultado = {
+            "itens": len(dados["resultado"]),
+            "bytes": len(corpo),
+            "bytes_gzip": len(gzip.compress(corpo, compresslevel=6, mtime=0)),
+            "us_jsonrenderer": medir(lambda: padrao.render(dados), repeticoes),
+            "us_orjson": medir(lambda: rapido.render(dados), repeticoes),
+            "us_gzip": medir(lambda: gzip.compress(corpo, compresslevel=6, mtime=0), repeticoes),
+        }
+        if brotli is not None:
+            resultado["bytes_brotli"] = len(brotli.compress(corpo, quality=4))
+            resultado["us_brotli"] = medir(lambda: brotli.compress(corpo, quality=4), repeticoes)
+        return resultado
+
+    def _requisicoes(self, consulta, repeticoes):
+        # Requisição completa pela pilha do Django, sem o cache de respostas, para cada Accept-Encoding
+        cliente = Client(HTTP_HOST="localhost")
+        url = f"/api/busca/?q={consulta}&limite=100"
+        resultado = {}
+        with override_settings(OPERADORAS_CACHE_HABILITADO=False):
+            for nome, codificacao in [("identity", "identity"), ("gzip", "gzip"), ("br", "br, gzip")]:
+                resposta = cliente.get(url, HTTP_ACCEPT_ENCODING=codificacao)
+                resultado[f"bytes_{nome}"] = len(resposta.content)
+                resultado[f"us_{nome}"] = medir(
+                    lambda: cliente.get(url, HTTP_ACCEPT_ENCODING=codificacao), max(1, repeticoes // 10)
+                )
+        return resultado
+
+    def handle(self, *args, **options):
+        resultados = {
+            "data": datetime.now(timezone.utc).isoformat(),
+            "versoes": {"python": platform.python_version(), "brotli": brotli is not None},
+            "consultas": {},
+        }
+        for consulta in options["consultas"]:
+            serializacao = self._serializacao(consulta, options["repeticoes"])
+            requisicoes = self._requisicoes(consulta, options["repeticoes"])
+            resultados["consultas"][consulta] = {"serializacao": serializacao, "requisicao": requisicoes}
+
+            self.stdout.write(
+                f"{consulta!r:>10}: {serializacao['itens']} itens, {serializacao['bytes']} B | "
+                f"JSONRenderer {serializacao['us_jsonrenderer']} us -> orjson {serializacao['us_orjson']} us | "
+                f"gzip {serializacao['bytes_gzip']} B ({serializacao['us_gzip']} us)"
+                + (f" | brotli {serializacao['bytes_brotli']} B ({serializacao['us_brotli']} us)"
+                   if "bytes_brotli" in serializacao else "")
+            )
+            self.stdout.write(
+                f"{'':>10}  requisição: identity {requisicoes['bytes_identity']} B / {requisicoes['us_identity']} us | "
+                f"gzip {requisicoes['bytes_gzip']} B / {requisicoes['us_gzip']} us | "
+                f"br {requisicoes['bytes_br']} B / {requisicoes['us_br']} us"
+            )
+
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as f:
+                json.dump(resultados, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultados salvos em: {options['saida']}")
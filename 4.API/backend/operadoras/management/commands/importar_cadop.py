@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from operadoras.models import Operadora
+from operadoras.utils import importar_csv, sincronizar_csv
+from operadoras.versao import incrementar_versao
+
+
+class Command(BaseCommand):
+    help = "Importa o relatório CADOP (Relatorio_cadop.csv) para a tabela de operadoras"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "caminho", nargs="?", default=str(settings.BASE_DIR / "Relatorio_cadop.csv"),
+            help="caminho do CSV do CADOP",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000, help="tamanho dos lotes do bulk_create")
+        parser.add_argument("--limpar", action="store_true", help="apaga as operadoras antes de importar")
+        parser.add_argument(
+            "--sincronizar", action="store_true",
+            help="aplica só inserções, atualizações e desativações em relação ao banco",
+        )
+
+    def handle(self, *args, **options):
+        if options["limpar"]:
+            apagadas, _ = Operadora.objects.all().delete()
+            incrementar_versao()
+            self.stdout.write(f"{apagadas} operadoras removidas")
+
+        inicio = time.perf_counter()
+        if options["sincronizar"]:
+            resultado = sincronizar_csv(options["caminho"], batch_size=options["batch_size"])
+            duracao = time.perf_counter() - inicio
+            if resultado is not None:
+                self.stdout.write(self.style.SUCCESS(f"Sincronização em {duracao:.2f}s: {resultado}"))
+            return
+
+        importadas = importar_csv(options["caminho"], batch_size=options["batch_size"])
+        duracao = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{importadas} linhas em {duracao:.2f}s ({importadas / duracao if duracao else 0:.0f} linhas/s)"
+        ))
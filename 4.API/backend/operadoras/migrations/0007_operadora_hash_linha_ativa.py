@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operadoras', '0006_alter_operadora_registro_ans'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operadora',
+            name='Ativa',
+            field=models.BooleanField(db_default=True, default=True),
+        ),
+        migrations.AddField(
+            model_name='operadora',
+            name='Hash_Linha',
+            field=models.CharField(db_default='', default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+from operadoras.normalizacao import normalizar
+
+
+TABELA = '"operadoras_operadora"'
+TABELA_FTS = "operadoras_operadora_fts"
+
+# Índice trigram (pg_trgm) sobre a razão social normalizada
+POSTGRESQL_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f'CREATE INDEX IF NOT EXISTS operadora_busca_trgm ON {TABELA} USING gin ("Razao_Social_Busca" gin_trgm_ops)',
+]
+POSTGRESQL_REMOVER = ["DROP INDEX IF EXISTS operadora_busca_trgm"]
+
+# Tabela FTS5 de conteúdo externo, mantida em sincronia por triggers
+SQLITE_CRIAR = [
+    f"CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5("
+    f"Razao_Social_Busca, content={TABELA}, content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {TABELA_FTS}_ai AFTER INSERT ON {TABELA} BEGIN "
+    f"INSERT INTO {TABELA_FTS}(rowid, Razao_Social_Busca) VALUES (new.id, new.Razao_Social_Busca); END",
+    f"CREATE TRIGGER {TABELA_FTS}_ad AFTER DELETE ON {TABELA} BEGIN "
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, Razao_Social_Busca) "
+    f"VALUES ('delete', old.id, old.Razao_Social_Busca); END",
+    f"CREATE TRIGGER {TABELA_FTS}_au AFTER UPDATE ON {TABELA} BEGIN "
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, Razao_Social_Busca) "
+    f"VALUES ('delete', old.id, old.Razao_Social_Busca); "
+    f"INSERT INTO {TABELA_FTS}(rowid, Razao_Social_Busca) VALUES (new.id, new.Razao_Social_Busca); END",
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+SQLITE_REMOVER = [
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+    f"DROP TABLE IF EXISTS {TABELA_FTS}",
+]
+
+
+def preencher_busca(apps, schema_editor):
+    Operadora = apps.get_model("operadoras", "Operadora")
+    operadoras = list(Operadora.objects.only("id", "Razao_Social"))
+    for operadora in operadoras:
+        operadora.Razao_Social_Busca = normalizar(operadora.Razao_Social)
+    Operadora.objects.bulk_update(operadoras, ["Razao_Social_Busca"], batch_size=2000)
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def criar_indice_busca(apps, schema_editor):
+    _executar(schema_editor, {"postgresql": POSTGRESQL_CRIAR, "sqlite": SQLITE_CRIAR})
+
+
+def remover_indice_busca(apps, schema_editor):
+    _executar(schema_editor, {"postgresql": POSTGRESQL_REMOVER, "sqlite": SQLITE_REMOVER})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operadoras', '0007_operadora_hash_linha_ativa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operadora',
+            name='Razao_Social_Busca',
+            field=models.CharField(db_default='', default='', max_length=200),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:04
+
+import hashlib
+
+from django.db import migrations, models
+
+
+# Colunas do CADOP que entram no Hash_Linha a partir desta migração (operadoras.utils.CAMPOS)
+CAMPOS_HASH = [
+    "Registro_ANS", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade", "Logradouro", "Numero",
+    "Complemento", "Bairro", "Cidade", "UF", "CEP", "DDD", "Telefone", "Fax",
+    "Endereco_eletronico", "Representante", "Cargo_Representante",
+    "Regiao_de_Comercializacao", "Data_Registro_ANS",
+]
+
+
+def recalcular_hashes(apps, schema_editor):
+    # Com Nome_Fantasia no hash, os valores gravados antes desta migração deixariam de conferir
+    # e a primeira sincronização reescreveria a tabela inteira
+    Operadora = apps.get_model("operadoras", "Operadora")
+    operadoras = []
+    for operadora in Operadora.objects.exclude(Hash_Linha="").only("id", *CAMPOS_HASH).iterator(chunk_size=2000):
+        valores = [getattr(operadora, campo) for campo in CAMPOS_HASH]
+        operadora.Hash_Linha = hashlib.sha256("\x1f".join(valores).encode("utf-8")).hexdigest()
+        operadoras.append(operadora)
+    Operadora.objects.bulk_update(operadoras, ["Hash_Linha"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operadoras', '0008_operadora_razao_social_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='operadora',
+            name='Nome_Fantasia',
+            field=models.CharField(db_default='', default='', max_length=200),
+        ),
+        migrations.RunPython(recalcular_hashes, migrations.RunPython.noop),
+    ]
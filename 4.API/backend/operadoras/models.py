@@ -1,9 +1,13 @@
 from django.db import models
+from django.utils import timezone
+from .normalizacao import normalizar
 
 class Operadora(models.Model):
     Registro_ANS = models.CharField(max_length=200, unique=True)
     CNPJ = models.CharField(max_length=100)
     Razao_Social = models.CharField(max_length=200)
+    Razao_Social_Busca = models.CharField(max_length=200, default="", db_default="")  # sem acentos e em minúsculas
+    Nome_Fantasia = models.CharField(max_length=200, default="", db_default="")
     Modalidade = models.CharField(max_length=100)
     Logradouro = models.CharField(max_length=200)
     Numero = models.CharField(max_length=20)
@@ -20,7 +24,20 @@ class Operadora(models.Model):
     Cargo_Representante = models.CharField(max_length=100)
     Regiao_de_Comercializacao = models.CharField(max_length=100)
     Data_Registro_ANS = models.CharField(max_length=100)
+    Hash_Linha = models.CharField(max_length=64, default="", db_default="")  # SHA-256 da linha do CADOP
+    Ativa = models.BooleanField(default=True, db_default=True)  # False quando a operadora sai do CADOP
 
+    def save(self, *args, **kwargs):
+        self.Razao_Social_Busca = normalizar(self.Razao_Social)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.Razao_Social
+
+class VersaoDados(models.Model):
+    # Linha única com a versão do conjunto de operadoras, incrementada a cada importação ou sincronização
+    versao = models.PositiveBigIntegerField(default=0)
+    atualizado_em = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"v{self.versao} ({self.atualizado_em:%Y-%m-%d %H:%M:%S})"
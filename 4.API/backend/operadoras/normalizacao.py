@@ -0,0 +1,8 @@
+import re
+import unicodedata
+
+def normalizar(texto):
+    # Remove acentos, passa para minúsculas e junta espaços repetidos ("SAÚDE  Ltda" -> "saude ltda")
+    sem_acento = unicodedata.normalize("NFKD", texto or "")
+    sem_acento = "".join(c for c in sem_acento if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sem_acento).strip().lower()
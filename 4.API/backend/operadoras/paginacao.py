@@ -0,0 +1,122 @@
+import base64
+import json
+import binascii
+from django.conf import settings
+from django.db.models import Q
+
+# Campos que podem ser pedidos em `fields`
+CAMPOS_PERMITIDOS = [
+    "id", "Registro_ANS", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade", "Logradouro",
+    "Numero", "Complemento", "Bairro", "Cidade", "UF", "CEP", "DDD", "Telefone", "Fax",
+    "Endereco_eletronico", "Representante", "Cargo_Representante", "Regiao_de_Comercializacao",
+    "Data_Registro_ANS",
+]
+
+# Campos devolvidos quando `fields` não é informado
+CAMPOS_PADRAO = ["id", "Registro_ANS", "CNPJ", "Razao_Social", "Modalidade", "Cidade", "UF"]
+
+VERDADEIROS = {"1", "true", "sim"}
+
+class ParametroInvalido(ValueError):
+    pass
+
+def codificar_cursor(dados):
+    return base64.urlsafe_b64encode(json.dumps(dados, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor):
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ParametroInvalido("cursor inválido")
+    if not isinstance(dados, dict):
+        raise ParametroInvalido("cursor inválido")
+    return dados
+
+def _inteiro(valor, nome, minimo):
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ParametroInvalido(f"{nome} deve ser um número inteiro")
+    if numero < minimo:
+        raise ParametroInvalido(f"{nome} deve ser maior ou igual a {minimo}")
+    return numero
+
+def campos_requisitados(params):
+    # Campos pedidos em `fields`, na ordem informada e sem repetições
+    if not params.get("fields"):
+        return CAMPOS_PADRAO
+    campos = list(dict.fromkeys(campo.strip() for campo in params["fields"].split(",") if campo.strip()))
+    desconhecidos = [campo for campo in campos if campo not in CAMPOS_PERMITIDOS]
+    if desconhecidos:
+        raise ParametroInvalido(f"campos desconhecidos: {', '.join(desconhecidos)}")
+    return campos
+
+class Paginacao:
+    """
+    Parâmetros de paginação e projeção de uma requisição de busca
+
+    limite: itens por página, limitado a OPERADORAS_BUSCA_LIMITE_MAXIMO
+    offset: paginação por deslocamento
+    cursor: paginação por chave (keyset), tem precedência sobre o offset
+    fields: campos devolvidos, separados por vírgula
+    total: quando verdadeiro, inclui a contagem total de resultados
+    """
+    def __init__(self, params):
+        maximo = settings.OPERADORAS_BUSCA_LIMITE_MAXIMO
+        self.limite = min(_inteiro(params.get("limite", settings.OPERADORAS_BUSCA_LIMITE_PADRAO), "limite", 1), maximo)
+        self.offset = _inteiro(params.get("offset", 0), "offset", 0)
+        self.cursor = decodificar_cursor(params["cursor"]) if params.get("cursor") else None
+        self.total = params.get("total", "").lower() in VERDADEIROS
+        self.campos = campos_requisitados(params)
+
+    def _projetar(self, linha):
+        return {campo: linha[campo] for campo in self.campos}
+
+    def _pagina(self, queryset):
+        # Espera um queryset ordenado por (-relevancia, id), como o devolvido por busca.buscar
+        if self.cursor is not None:
+            try:
+                relevancia, id_ = float(self.cursor["r"]), int(self.cursor["id"])
+            except (KeyError, TypeError, ValueError):
+                raise ParametroInvalido("cursor inválido")
+            pagina = queryset.filter(Q(relevancia__lt=relevancia) | Q(relevancia=relevancia, id__gt=id_))
+        else:
+            pagina = queryset[self.offset:] if self.offset else queryset
+
+        # Só as colunas pedidas saem do banco; uma linha a mais indica se há próxima página
+        return pagina.values(*dict.fromkeys(self.campos + ["id", "relevancia"]))[:self.limite + 1]
+
+    def _resposta(self, linhas):
+        proximo = None
+        if len(linhas) > self.limite:
+            linhas = linhas[:self.limite]
+            proximo = codificar_cursor({"r": linhas[-1]["relevancia"], "id": linhas[-1]["id"]})
+        return {"resultado": [self._projetar(linha) for linha in linhas], "proximo": proximo}
+
+    def paginar_queryset(self, queryset):
+        resposta = self._resposta(list(self._pagina(queryset)))
+        if self.total:
+            resposta["total"] = queryset.count()
+        return resposta
+
+    async def apaginar_queryset(self, queryset):
+        resposta = self._resposta([linha async for linha in self._pagina(queryset)])
+        if self.total:
+            resposta["total"] = await queryset.acount()
+        return resposta
+
+    def paginar_lista(self, buscar_lista):
+        # Paginação de resultados já ordenados em memória; o cursor guarda apenas o deslocamento
+        inicio = self.offset
+        if self.cursor is not None:
+            try:
+                inicio = _inteiro(self.cursor["o"], "cursor", 0)
+            except KeyError:
+                raise ParametroInvalido("cursor inválido")
+
+        linhas = buscar_lista(inicio + self.limite + 1)[inicio:]
+        proximo = codificar_cursor({"o": inicio + self.limite}) if len(linhas) > self.limite else None
+        resposta = {"resultado": [self._projetar(linha) for linha in linhas[:self.limite]], "proximo": proximo}
+        if self.total:
+            resposta["total"] = len(buscar_lista(None))
+        return resposta
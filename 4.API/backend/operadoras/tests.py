@@ -1,3 +1,325 @@
-from django.test import TestCase
+from unittest import skipIf
+from django.db import connection
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from backend.middleware import CompressaoMiddleware
+from backend.renderers import ORJSONRenderer
+from . import indice, versao
+from .busca import buscar
+from .cache import obter_cache
+from .indice import IndiceBusca
+from .models import Operadora
+from .paginacao import decodificar_cursor
+from .versao import incrementar_versao
 
-# Create your tests here.
+URL_BUSCA = "/api/busca/"
+
+def criar_operadora(registro_ans, razao_social, **campos):
+    dados = {campo.name: "" for campo in Operadora._meta.concrete_fields if campo.get_internal_type() == "CharField"}
+    dados.update(Registro_ANS=registro_ans, CNPJ=f"{registro_ans:0>14}", Razao_Social=razao_social, UF="SP", **campos)
+    return Operadora.objects.create(**dados)
+
+# Configurações que os testes assumem, independentes das do ambiente
+@override_settings(OPERADORAS_INDICE_MEMORIA=False, OPERADORAS_CACHE_HABILITADO=True, OPERADORAS_CACHE_BACKEND=None)
+class OperadorasTestCase(TestCase):
+    def setUp(self):
+        # Versão dos dados, índice em memória e cache de respostas ficam no processo; cada teste começa sem eles
+        versao._versao = None
+        indice._indice = None
+        obter_cache().limpar()
+
+class BuscaTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.campinas = criar_operadora("100001", "UNIMED CAMPINAS COOPERATIVA DE TRABALHO MÉDICO")
+        cls.central = criar_operadora("100002", "CENTRAL NACIONAL UNIMED")
+        cls.sao_jose = criar_operadora("100003", "Associação Beneficente São José")
+        cls.inativa = criar_operadora("100004", "UNIMED INATIVA", Ativa=False)
+
+    def test_busca_ignora_acentos_e_maiusculas(self):
+        for termo in ["sao jose", "SÃO JOSÉ", "Associacao"]:
+            with self.subTest(termo=termo):
+                self.assertEqual(list(buscar(termo).values_list("id", flat=True)), [self.sao_jose.id])
+
+    def test_busca_ignora_operadoras_inativas(self):
+        self.assertNotIn(self.inativa.id, buscar("unimed").values_list("id", flat=True))
+
+    def test_busca_sem_termo_nao_devolve_nada(self):
+        self.assertFalse(buscar("  ").exists())
+
+    def test_termo_que_normaliza_para_vazio(self):
+        # Espaços ou um acento solto passam pelo "if not query" da view, mas não sobra termo para buscar
+        for termo in [" ", "´"]:
+            with self.subTest(termo=termo):
+                resposta = self.client.get(URL_BUSCA, {"q": termo})
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.json(), {"resultado": [], "proximo": None})
+
+    @skipIf(connection.vendor == "postgresql", "no PostgreSQL a ordem vem da similaridade por trigramas")
+    def test_nome_que_comeca_pelo_termo_vem_primeiro(self):
+        ids = list(buscar("unimed").values_list("id", flat=True))
+        self.assertEqual(ids, [self.campinas.id, self.central.id])
+
+    def test_resposta_da_busca(self):
+        resposta = self.client.get(URL_BUSCA, {"q": "são josé"})
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual([item["Registro_ANS"] for item in dados["resultado"]], ["100003"])
+        self.assertIsNone(dados["proximo"])
+
+    def test_fields_limita_os_campos_devolvidos(self):
+        resposta = self.client.get(URL_BUSCA, {"q": "campinas", "fields": "Registro_ANS,UF"})
+        self.assertEqual(resposta.json()["resultado"][0], {"Registro_ANS": "100001", "UF": "SP"})
+
+    def test_parametros_invalidos_devolvem_400_sem_cache_http(self):
+        for parametros in [{"q": "unimed", "limite": "0"}, {"q": "unimed", "fields": "Senha"},
+                           {"q": "unimed", "cursor": "invalido"}]:
+            with self.subTest(parametros=parametros):
+                resposta = self.client.get(URL_BUSCA, parametros)
+                self.assertEqual(resposta.status_code, 400)
+                self.assertIn("erro", resposta.json())
+                self.assertFalse(resposta.has_header("ETag"))
+                self.assertIn("no-store", resposta["Cache-Control"])
+
+class PaginacaoTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for numero in range(7):
+            criar_operadora(f"2000{numero:02}", f"OPERADORA PAGINADA {numero}")
+
+    def _paginas(self, **parametros):
+        paginas, cursor = [], None
+        while True:
+            dados = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 3, **parametros,
+                                                **({"cursor": cursor} if cursor else {})}).json()
+            paginas.append([item["id"] for item in dados["resultado"]])
+            cursor = dados["proximo"]
+            if cursor is None:
+                return paginas
+
+    def test_cursor_percorre_todos_os_resultados_sem_repetir(self):
+        paginas = self._paginas()
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 1])
+        ids = [id_ for pagina in paginas for id_ in pagina]
+        self.assertEqual(ids, list(buscar("paginada").values_list("id", flat=True)))
+
+    def test_cursor_nao_perde_empates_na_relevancia(self):
+        # Todos os nomes têm o mesmo tamanho e a mesma relevância; o desempate fica com o id.
+        # No PostgreSQL a similaridade é real, e o valor do cursor precisa voltar igual ao do banco
+        relevancias = set(buscar("paginada").values_list("relevancia", flat=True))
+        self.assertEqual(len(relevancias), 1)
+        ids = [id_ for pagina in self._paginas(limite=2) for id_ in pagina]
+        self.assertEqual(ids, sorted(Operadora.objects.values_list("id", flat=True)))
+
+    def test_cursor_e_offset_devolvem_as_mesmas_paginas(self):
+        cursor = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 3}).json()["proximo"]
+        por_cursor = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 3, "cursor": cursor}).json()
+        por_offset = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 3, "offset": 3}).json()
+        self.assertEqual(por_cursor["resultado"], por_offset["resultado"])
+        self.assertEqual(set(decodificar_cursor(cursor)), {"r", "id"})
+
+    @override_settings(OPERADORAS_INDICE_MEMORIA=True)
+    def test_cursor_com_indice_em_memoria(self):
+        with self.assertNumQueries(2):  # Versão dos dados e montagem do índice
+            paginas = self._paginas()
+        ids = [id_ for pagina in paginas for id_ in pagina]
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 1])
+        self.assertCountEqual(ids, buscar("paginada").values_list("id", flat=True))
+
+    def test_total_opcional(self):
+        dados = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 3, "total": "sim"}).json()
+        self.assertEqual(dados["total"], 7)
+        self.assertNotIn("total", self.client.get(URL_BUSCA, {"q": "paginada"}).json())
+
+    @override_settings(OPERADORAS_BUSCA_LIMITE_MAXIMO=5)
+    def test_limite_maximo(self):
+        dados = self.client.get(URL_BUSCA, {"q": "paginada", "limite": 50}).json()
+        self.assertEqual(len(dados["resultado"]), 5)
+
+class CacheRespostasTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        criar_operadora("300001", "OPERADORA EM CACHE")
+
+    def test_repeticao_vem_do_cache_sem_consultas(self):
+        primeira = self.client.get(URL_BUSCA, {"q": "cache"})
+        self.assertEqual(primeira["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            segunda = self.client.get(URL_BUSCA, {"q": "cache"})
+        self.assertEqual(segunda["X-Cache"], "HIT")
+        self.assertEqual(segunda.content, primeira.content)
+        # Só os cabeçalhos próprios de cada requisição podem mudar entre a resposta original e a do cache
+        por_requisicao = {"X-Cache", "Server-Timing"}
+        self.assertEqual({nome: valor for nome, valor in segunda.items() if nome not in por_requisicao},
+                         {nome: valor for nome, valor in primeira.items() if nome not in por_requisicao})
+
+    def test_ordem_dos_parametros_nao_muda_a_chave(self):
+        self.client.get(f"{URL_BUSCA}?q=cache&limite=5")
+        self.assertEqual(self.client.get(f"{URL_BUSCA}?limite=5&q=cache")["X-Cache"], "HIT")
+
+    def test_nova_versao_dos_dados_invalida_o_cache(self):
+        self.client.get(URL_BUSCA, {"q": "operadora"})
+        criar_operadora("300002", "OUTRA OPERADORA")
+        incrementar_versao()
+
+        resposta = self.client.get(URL_BUSCA, {"q": "operadora"})
+        self.assertEqual(resposta["X-Cache"], "MISS")
+        self.assertEqual(len(resposta.json()["resultado"]), 2)
+
+    def test_erros_nao_sao_guardados(self):
+        self.client.get(URL_BUSCA, {"q": "cache", "limite": "x"})
+        self.assertEqual(self.client.get(URL_BUSCA, {"q": "cache", "limite": "x"})["X-Cache"], "MISS")
+
+    @override_settings(OPERADORAS_CACHE_HABILITADO=False)
+    def test_cache_desabilitado(self):
+        self.client.get(URL_BUSCA, {"q": "cache"})
+        self.assertFalse(self.client.get(URL_BUSCA, {"q": "cache"}).has_header("X-Cache"))
+
+class RespostaCondicionalTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        criar_operadora("400001", "OPERADORA CONDICIONAL")
+        incrementar_versao()  # Sem versão registrada não há Last-Modified
+
+    def test_etag_e_cache_control(self):
+        resposta = self.client.get(URL_BUSCA, {"q": "condicional"})
+        self.assertTrue(resposta.has_header("ETag"))
+        self.assertTrue(resposta.has_header("Last-Modified"))
+        self.assertIn("public", resposta["Cache-Control"])
+        self.assertIn("Accept", resposta["Vary"])
+
+    def test_if_none_match_devolve_304_sem_consultar_operadoras(self):
+        etag = self.client.get(URL_BUSCA, {"q": "condicional"})["ETag"]
+        obter_cache().limpar()
+
+        with self.assertNumQueries(0):
+            resposta = self.client.get(URL_BUSCA, {"q": "condicional"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta["ETag"], etag)
+        self.assertEqual(resposta.content, b"")
+
+    def test_etag_muda_com_a_versao_dos_dados(self):
+        etag = self.client.get(URL_BUSCA, {"q": "condicional"})["ETag"]
+        incrementar_versao()
+
+        resposta = self.client.get(URL_BUSCA, {"q": "condicional"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta["ETag"], etag)
+
+    def test_etag_muda_com_os_parametros(self):
+        primeira = self.client.get(URL_BUSCA, {"q": "condicional"})["ETag"]
+        segunda = self.client.get(URL_BUSCA, {"q": "condicional", "limite": 1})["ETag"]
+        self.assertNotEqual(primeira, segunda)
+
+class ViewsAsyncTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        criar_operadora("500001", "OPERADORA ASSÍNCRONA")
+
+    async def test_busca_async_igual_a_sincrona(self):
+        resposta = await self.async_client.get("/api/async/busca/", {"q": "assincrona"})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()["resultado"][0]["Registro_ANS"], "500001")
+
+    async def test_busca_async_com_termo_que_normaliza_para_vazio(self):
+        resposta = await self.async_client.get("/api/async/busca/", {"q": "´"})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json(), {"resultado": [], "proximo": None})
+
+    async def test_consulta_por_registro(self):
+        resposta = await self.async_client.get("/api/async/operadoras/500001/")
+        self.assertEqual(resposta.json()["resultado"]["Razao_Social"], "OPERADORA ASSÍNCRONA")
+
+        resposta = await self.async_client.get("/api/async/operadoras/999999/")
+        self.assertEqual(resposta.status_code, 404)
+        self.assertFalse(resposta.has_header("ETag"))
+
+class MetricasTests(OperadorasTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        criar_operadora("600001", "OPERADORA MEDIDA")
+
+    @override_settings(METRICAS_HABILITADAS=True)
+    def test_server_timing_e_metrics_habilitados(self):
+        # O middleware é carregado na primeira requisição de cada Client, já com a configuração alterada
+        client = Client()
+        resposta = client.get(URL_BUSCA, {"q": "medida"})
+        self.assertRegex(resposta["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* consultas"')
+        self.assertIn("total;dur=", resposta["Server-Timing"])
+        client.generic("FOO", URL_BUSCA)
+
+        metricas = client.get("/metrics")
+        self.assertEqual(metricas.status_code, 200)
+        self.assertTrue(metricas["Content-Type"].startswith("text/plain; version=0.0.4"))
+        texto = metricas.content.decode()
+        self.assertIn('http_requisicoes_total{view="buscar_operadoras",metodo="GET",status="200"}', texto)
+        self.assertIn('metodo="outro"', texto)
+        self.assertNotIn('metodo="FOO"', texto)
+        self.assertIn('http_duracao_segundos_bucket{view="buscar_operadoras",le="+Inf"}', texto)
+        self.assertIn("operadoras_cache_consultas_total", texto)
+
+    @override_settings(METRICAS_HABILITADAS=False)
+    def test_metrics_desabilitado(self):
+        client = Client()
+        self.assertFalse(client.get(URL_BUSCA, {"q": "medida"}).has_header("Server-Timing"))
+        self.assertEqual(client.get("/metrics").status_code, 404)
+
+class IndiceBuscaTests(SimpleTestCase):
+    DOCUMENTOS = [
+        {"id": 1, "Registro_ANS": "700001", "CNPJ": "19541931000125", "Razao_Social": "UNIMED CAMPINAS",
+         "Nome_Fantasia": "", "Modalidade": "", "Cidade": "", "UF": "SP"},
+        {"id": 2, "Registro_ANS": "700002", "CNPJ": "22869997000153", "Razao_Social": "CENTRAL NACIONAL UNIMED",
+         "Nome_Fantasia": "CNU", "Modalidade": "", "Cidade": "", "UF": "SP"},
+        {"id": 3, "Registro_ANS": "700003", "CNPJ": "11111111000111", "Razao_Social": "Associação São José",
+         "Nome_Fantasia": "", "Modalidade": "", "Cidade": "", "UF": "MG"},
+    ]
+
+    def setUp(self):
+        self.indice_busca = IndiceBusca(self.DOCUMENTOS)
+
+    def _ids(self, consulta, limite=20):
+        return [documento["id"] for documento in self.indice_busca.buscar(consulta, limite)]
+
+    def test_busca_normalizada_e_ordenada(self):
+        self.assertEqual(self._ids("sao jose"), [3])
+        self.assertEqual(self._ids("unimed"), [1, 2])
+        self.assertEqual(self._ids("unimed", limite=1), [1])
+
+    def test_prefixos_curtos_e_campos_numericos(self):
+        self.assertEqual(self._ids("as"), [3])
+        self.assertEqual(self._ids("19.541.931/0001-25"), [1])
+        self.assertEqual(self._ids("700002"), [2])
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_mesmo_json_do_renderer_do_drf(self):
+        dados = {
+            "utc": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "fuso": datetime(2024, 5, 1, 9, 30, tzinfo=timezone(timedelta(hours=-3))),
+            "data": datetime(2024, 5, 1).date(),
+            "valor": Decimal("10.50"),
+            "inteiro_grande": 2 ** 70,
+            "nome": "São José",
+        }
+        for parcial in [dados, {chave: valor for chave, valor in dados.items() if chave != "inteiro_grande"}]:
+            with self.subTest(chaves=sorted(parcial)):
+                self.assertEqual(ORJSONRenderer().render(parcial), JSONRenderer().render(parcial))
+
+class CompressaoTests(SimpleTestCase):
+    def _resposta(self, content_type):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        corpo = b'{"resultado": "' + b"operadora " * 200 + b'"}'
+        return CompressaoMiddleware(lambda request: HttpResponse(corpo, content_type=content_type))(request)
+
+    def test_json_e_compactado(self):
+        resposta = self._resposta("application/json")
+        self.assertEqual(resposta["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", resposta["Vary"])
+
+    def test_html_nao_e_compactado(self):
+        # Páginas com token CSRF ficam sem compactação (BREACH)
+        resposta = self._resposta("text/html; charset=utf-8")
+        self.assertFalse(resposta.has_header("Content-Encoding"))
@@ -1,6 +1,10 @@
 from django.urls import path
 from .views import buscar_operadoras
+from .views_async import abuscar_operadoras, aobter_operadora
 
 urlpatterns = [
     path("busca/", buscar_operadoras, name="buscar_operadoras"), 
+    # Rotas async, para implantação ASGI
+    path("async/busca/", abuscar_operadoras, name="abuscar_operadoras"),
+    path("async/operadoras/<str:registro_ans>/", aobter_operadora, name="aobter_operadora"),
 ]
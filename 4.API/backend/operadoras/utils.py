@@ -1,40 +1,163 @@
+import io
+import hashlib
 import pandas as pd
+from django.db import connection, transaction
+from .indice import indice_habilitado, reconstruir_indice
 from .models import Operadora
+from .normalizacao import normalizar
+from .versao import incrementar_versao
+
+# Colunas do CADOP gravadas no modelo
+CAMPOS = [
+    "Registro_ANS", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade", "Logradouro", "Numero",
+    "Complemento", "Bairro", "Cidade", "UF", "CEP", "DDD", "Telefone", "Fax",
+    "Endereco_eletronico", "Representante", "Cargo_Representante",
+    "Regiao_de_Comercializacao", "Data_Registro_ANS",
+]
+
+# Colunas gravadas na importação: os dados do CADOP, a razão social normalizada para busca e o hash de cada linha
+CAMPOS_IMPORTACAO = CAMPOS + ["Razao_Social_Busca", "Hash_Linha"]
+
+def hash_linha(valores):
+    return hashlib.sha256("\x1f".join(valores).encode("utf-8")).hexdigest()
+
+def ler_csv(caminho_arquivo):
+    # Como só precisamos da busca, estou utilizando string para evitar problemas.
+    df = pd.read_csv(caminho_arquivo, delimiter=";", encoding="utf-8", dtype=str, keep_default_na=False)
+    for campo in CAMPOS:
+        if campo not in df.columns:
+            df[campo] = ""
+    df = df[CAMPOS].copy()
+    hashes = [hash_linha(valores) for valores in df.itertuples(index=False, name=None)]
+    df["Razao_Social_Busca"] = df["Razao_Social"].map(normalizar)
+    df["Hash_Linha"] = hashes
+    return df
+
+def _importar_bulk(df, batch_size):
+    # Monta as instâncias em lotes; registros já existentes são ignorados, como no insert linha a linha
+    for inicio in range(0, len(df), batch_size):
+        lote = df.iloc[inicio:inicio + batch_size]
+        Operadora.objects.bulk_create(
+            [Operadora(**dict(zip(CAMPOS_IMPORTACAO, valores))) for valores in lote.itertuples(index=False, name=None)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+def _copiar_para_staging(cursor, tabela, df):
+    # COPY FROM STDIN com psycopg2 (copy_expert) ou psycopg 3 (copy). No formato csv um campo vazio
+    # seria NULL, então FORCE_NOT_NULL mantém as strings vazias do CADOP
+    colunas = ", ".join(connection.ops.quote_name(campo) for campo in CAMPOS_IMPORTACAO)
+    sql = f"COPY {tabela} ({colunas}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({colunas}))"
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    bruto = cursor.cursor
+    if hasattr(bruto, "copy_expert"):
+        bruto.copy_expert(sql, buffer)
+    else:
+        with bruto.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+def _importar_copy(df):
+    # No PostgreSQL os dados vão por COPY para uma tabela temporária e depois para a tabela final
+    tabela = connection.ops.quote_name(Operadora._meta.db_table)
+    colunas = ", ".join(connection.ops.quote_name(campo) for campo in CAMPOS_IMPORTACAO)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE operadoras_staging ON COMMIT DROP AS "
+            f"SELECT {colunas} FROM {tabela} WITH NO DATA"
+        )
+        # A ordem de chegada das linhas do COPY decide qual repetição de um Registro_ANS é mantida
+        cursor.execute('ALTER TABLE operadoras_staging ADD COLUMN "Ordem" bigserial')
+        _copiar_para_staging(cursor, "operadoras_staging", df)
+        # Registro_ANS repetido no CSV: fica a primeira linha, como no bulk_create com ignore_conflicts
+        cursor.execute(
+            f"INSERT INTO {tabela} ({colunas}) "
+            f'SELECT DISTINCT ON ("Registro_ANS") {colunas} FROM operadoras_staging '
+            f'ORDER BY "Registro_ANS", "Ordem" '
+            f'ON CONFLICT ("Registro_ANS") DO NOTHING'
+        )
+
+def importar_csv(caminho_arquivo, batch_size=2000):
 
-def importar_csv(caminho_arquivo):
-    
     try:
-        df = pd.read_csv(caminho_arquivo, delimiter=";", encoding="utf-8") # Como só precisamos da busca, estou utilizando string para evitar problemas.
+        df = ler_csv(caminho_arquivo)
     except Exception as e:
         print(f"Erro ao ler o CSV: {e}")
-        return
-  
+        return 0
+
     print(df.head(5))
 
-    for _, row in df.iterrows():
-        try:
-            Operadora.objects.create(
-                Registro_ANS=row.get("Registro_ANS", ""),
-                CNPJ=row.get("CNPJ", ""),
-                Razao_Social=row.get("Razao_Social", ""),
-                Modalidade=row.get("Modalidade", ""),
-                Logradouro=row.get("Logradouro", ""),
-                Numero=row.get("Numero", ""),
-                Complemento=row.get("Complemento", ""),
-                Bairro=row.get("Bairro", ""),
-                Cidade=row.get("Cidade", ""),
-                UF=row.get("UF", ""),
-                CEP=row.get("CEP", ""),
-                DDD=row.get("DDD", ""),
-                Telefone=row.get("Telefone", ""),
-                Fax=row.get("Fax", ""),
-                Endereco_eletronico=row.get("Endereco_eletronico", ""),
-                Representante=row.get("Representante", ""),
-                Cargo_Representante=row.get("Cargo_Representante", ""),
-                Regiao_de_Comercializacao=row.get("Regiao_de_Comercializacao", ""),
-                Data_Registro_ANS=row.get("Data_Registro_ANS", ""),
-            )
-        except Exception as e:
-            print(f"Erro ao importar operadora: {row.get('Registro_ANS')} | Erro: {e}")
-
-    print(f"✅ {len(df)} linhas importadas com sucesso!")
+    antes = Operadora.objects.count()
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            _importar_copy(df)
+        else:
+            _importar_bulk(df, batch_size)
+    importadas = Operadora.objects.count() - antes
+    incrementar_versao()
+    if indice_habilitado():
+        reconstruir_indice()
+
+    print(f"✅ {importadas} linhas importadas com sucesso!")
+    if importadas < len(df):
+        print(f"{len(df) - importadas} linhas ignoradas (Registro_ANS repetido no CSV ou já cadastrado)")
+    return importadas
+
+def sincronizar_csv(caminho_arquivo, batch_size=2000):
+    # Aplica apenas as diferenças entre o CSV e o banco, comparando o hash de cada linha
+    try:
+        df = ler_csv(caminho_arquivo)
+    except Exception as e:
+        print(f"Erro ao ler o CSV: {e}")
+        return None
+
+    # Registro_ANS repetido no CSV: fica a primeira linha, como na importação completa. Sem isso o upsert
+    # falha no PostgreSQL ("ON CONFLICT DO UPDATE command cannot affect row a second time")
+    repetidas = df["Registro_ANS"].duplicated()
+    if repetidas.any():
+        print(f"{int(repetidas.sum())} linhas ignoradas (Registro_ANS repetido no CSV)")
+        df = df[~repetidas]
+
+    existentes = {
+        registro: (hash_atual, ativa)
+        for registro, hash_atual, ativa in Operadora.objects.values_list("Registro_ANS", "Hash_Linha", "Ativa")
+    }
+
+    inseridas, atualizadas = [], []
+    for valores in df.itertuples(index=False, name=None):
+        dados = dict(zip(CAMPOS_IMPORTACAO, valores))
+        atual = existentes.get(dados["Registro_ANS"])
+        if atual is None:
+            inseridas.append(Operadora(**dados))
+        elif atual != (dados["Hash_Linha"], True):
+            atualizadas.append(Operadora(**dados))
+
+    removidas = set(registro for registro, (_, ativa) in existentes.items() if ativa) - set(df["Registro_ANS"])
+
+    with transaction.atomic():
+        # Inserções e atualizações em um único upsert por lote
+        Operadora.objects.bulk_create(
+            inseridas + atualizadas,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["Registro_ANS"],
+            update_fields=CAMPOS_IMPORTACAO[1:] + ["Ativa"],
+        )
+        # Operadoras que saíram do CADOP são apenas desativadas
+        Operadora.objects.filter(Registro_ANS__in=removidas).update(Ativa=False)
+    if inseridas or atualizadas or removidas:
+        incrementar_versao()
+    if indice_habilitado():
+        reconstruir_indice()
+
+    resultado = {
+        "inseridas": len(inseridas),
+        "atualizadas": len(atualizadas),
+        "desativadas": len(removidas),
+        "inalteradas": len(df) - len(inseridas) - len(atualizadas),
+    }
+    print(f"✅ Sincronização concluída: {resultado}")
+    return resultado
@@ -0,0 +1,57 @@
+import threading
+import time
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from .models import VersaoDados
+
+# Última versão lida do banco e o instante da leitura (time.monotonic)
+_versao = None
+_lida_em = 0.0
+_trava = threading.Lock()
+
+def _ler():
+    registro = VersaoDados.objects.filter(pk=1).values("versao", "atualizado_em").first()
+    if registro is None:
+        return 0, None
+    return registro["versao"], registro["atualizado_em"]
+
+def _expirada():
+    return _versao is None or time.monotonic() - _lida_em > getattr(settings, "OPERADORAS_VERSAO_INTERVALO", 2)
+
+async def _aler():
+    registro = await VersaoDados.objects.filter(pk=1).values("versao", "atualizado_em").afirst()
+    if registro is None:
+        return 0, None
+    return registro["versao"], registro["atualizado_em"]
+
+async def aversao_atual():
+    # Versão assíncrona de versao_atual, para views async; enquanto a leitura anterior vale, não há consulta
+    global _versao, _lida_em
+    if _expirada():
+        _versao = await _aler()
+        _lida_em = time.monotonic()
+    return _versao
+
+def versao_atual():
+    # Devolve (versao, atualizado_em). O banco só é consultado a cada OPERADORAS_VERSAO_INTERVALO
+    # segundos, para que importações feitas por outros processos sejam percebidas sem custo por requisição
+    global _versao, _lida_em
+    if _expirada():
+        with _trava:
+            if _expirada():
+                _versao = _ler()
+                _lida_em = time.monotonic()
+    return _versao
+
+def incrementar_versao():
+    # Chamado depois de importações e sincronizações; invalida os caches derivados dos dados
+    global _versao, _lida_em
+    agora = timezone.now()
+    atualizadas = VersaoDados.objects.filter(pk=1).update(versao=F("versao") + 1, atualizado_em=agora)
+    if not atualizadas:
+        VersaoDados.objects.get_or_create(pk=1, defaults={"versao": 1, "atualizado_em": agora})
+    with _trava:
+        _versao = _ler()
+        _lida_em = time.monotonic()
+    return _versao
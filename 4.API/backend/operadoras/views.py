@@ -1,25 +1,32 @@
-from rest_framework.decorators import api_view
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
-from .models import Operadora
+from .busca import buscar
+from .cache import cache_resposta, resposta_condicional
+from .indice import CAMPOS_RESULTADO, indice_habilitado, obter_indice
+from .paginacao import Paginacao, ParametroInvalido
 
+@resposta_condicional("busca")
+@cache_resposta("busca")
 @api_view(["GET"])
+@authentication_classes([])  # Busca pública: sem ler a sessão, a resposta não ganha Vary: Cookie e vale para o cache
 def buscar_operadoras(request):
+    try:
+        paginacao = Paginacao(request.GET)
+    except ParametroInvalido as e:
+        return Response({"erro": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     query = request.GET.get("q", "")
     if not query:
-        return Response({"resultado": []})
+        return Response({"resultado": [], "proximo": None})
+
+    try:
+        # Com o índice em memória habilitado, o autocomplete não passa pelo banco,
+        # a menos que sejam pedidos campos que o índice não guarda
+        if indice_habilitado() and set(paginacao.campos) <= set(CAMPOS_RESULTADO):
+            indice = obter_indice()
+            return Response(paginacao.paginar_lista(lambda limite: indice.buscar(query, limite)))
 
-    operadoras = Operadora.objects.filter(Razao_Social__icontains=query)
-    data = [
-        {
-            "id": op.id,
-            "Registro_ANS": op.Registro_ANS,
-            "CNPJ": op.CNPJ,
-            "Razao_Social": op.Razao_Social,
-            "Modalidade": op.Modalidade,
-            "Cidade": op.Cidade,
-            "UF": op.UF,
-        }
-        for op in operadoras
-    ]
-   
-    return Response({"resultado": data})
+        return Response(paginacao.paginar_queryset(buscar(query)))
+    except ParametroInvalido as e:
+        return Response({"erro": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,52 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from backend.renderers import ORJSONRenderer
+from .busca import buscar
+from .cache import cache_resposta, resposta_condicional
+from .indice import CAMPOS_RESULTADO, aobter_indice, indice_habilitado
+from .models import Operadora
+from .paginacao import Paginacao, ParametroInvalido, campos_requisitados
+
+# Versões async de buscar_operadoras e da consulta por registro, para execução sob ASGI (uvicorn).
+# Não passam pelo DRF, que só tem views síncronas, e respondem com JSON no mesmo formato.
+
+_renderer = ORJSONRenderer()
+
+def _json(dados, status=200):
+    return HttpResponse(_renderer.render(dados), status=status, content_type=_renderer.media_type)
+
+@resposta_condicional("busca_async")
+@cache_resposta("busca_async")
+@require_GET
+async def abuscar_operadoras(request):
+    try:
+        paginacao = Paginacao(request.GET)
+    except ParametroInvalido as e:
+        return _json({"erro": str(e)}, status=400)
+
+    query = request.GET.get("q", "")
+    if not query:
+        return _json({"resultado": [], "proximo": None})
+
+    try:
+        if indice_habilitado() and set(paginacao.campos) <= set(CAMPOS_RESULTADO):
+            indice = await aobter_indice()
+            return _json(paginacao.paginar_lista(lambda limite: indice.buscar(query, limite)))
+
+        return _json(await paginacao.apaginar_queryset(buscar(query)))
+    except ParametroInvalido as e:
+        return _json({"erro": str(e)}, status=400)
+
+@resposta_condicional("operadora_async")
+@cache_resposta("operadora_async")
+@require_GET
+async def aobter_operadora(request, registro_ans):
+    try:
+        campos = campos_requisitados(request.GET)
+    except ParametroInvalido as e:
+        return _json({"erro": str(e)}, status=400)
+
+    operadora = await Operadora.objects.filter(Registro_ANS=registro_ans, Ativa=True).values(*campos).afirst()
+    if operadora is None:
+        return _json({"erro": "operadora não encontrada"}, status=404)
+    return _json({"resultado": operadora})